@@ -11,6 +11,7 @@ base_packages = [
     "patsy>=0.5.1",
     "autograd>=1.2",
     "cvxpy>=1.0.24",
+    "ecos>=2.0.7",
     "Deprecated>=1.2.6",
     "requests>=2.23.0",
     "terminaltables==3.1.0"
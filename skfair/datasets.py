@@ -1,14 +1,121 @@
+import hashlib
+import json
 import os
 import shutil
+import tempfile
 import warnings
 from pkg_resources import resource_filename
 
 import requests
+import numpy as np
 import pandas as pd
 from sklearn.datasets import get_data_home
 from skfair.warning import FairnessWarning
 
 
+def _file_checksum(filepath):
+    sha256 = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(2 ** 20), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _write_column_cache(df, cache_dir):
+    """Writes every column to a .npy file, string columns as integer codes and their categories."""
+    columns = []
+    for i, name in enumerate(df.columns):
+        values = df[name].values
+        if values.dtype == object:
+            codes, categories = pd.factorize(values)
+            if not all(isinstance(category, str) for category in categories):
+                return False
+            np.save(os.path.join(cache_dir, f"{i}.npy"), codes)
+            np.save(os.path.join(cache_dir, f"{i}_categories.npy"), np.asarray(categories, dtype=str))
+            columns.append({"name": name, "strings": True})
+        else:
+            np.save(os.path.join(cache_dir, f"{i}.npy"), values)
+            columns.append({"name": name, "strings": False})
+    with open(os.path.join(cache_dir, "columns.json"), "w") as f:
+        json.dump(columns, f)
+    return True
+
+
+def _read_column_cache(cache_dir):
+    with open(os.path.join(cache_dir, "columns.json")) as f:
+        columns = json.load(f)
+    data = {}
+    for i, column in enumerate(columns):
+        # copy on write, such that the dataframe can be modified without touching the cache
+        values = np.load(os.path.join(cache_dir, f"{i}.npy"), mmap_mode="c")
+        if column["strings"]:
+            categories = np.load(os.path.join(cache_dir, f"{i}_categories.npy")).astype(object)
+            # the code of a missing value is -1, which picks the NaN that is appended to the categories
+            values = np.append(categories, np.nan)[values]
+        data[column["name"]] = values
+    # without a copy the numeric columns stay memory mapped, only the string columns are in memory
+    return pd.DataFrame(data, columns=[column["name"] for column in columns], copy=False)
+
+
+def _read_csv_cached(filepath, name, data_home=None):
+    """
+    Reads a (zipped) csv file through a cache of the parsed columns in the `skfair_cache` folder of
+    `get_data_home()`. The first call parses the file and writes every column as a .npy file, later
+    calls memory map these files instead of parsing the csv again. The cache is keyed on the sha256
+    checksum of the file, so a changed file is parsed again and replaces the old cache. When the
+    cache can not be read or written, e.g. in a read-only home folder, the parsed file is returned.
+
+    :param filepath: path of the csv file
+    :param name: name of the dataset, used as the name of its cache folder
+    :param data_home: the data home folder, see `sklearn.datasets.get_data_home`
+    :return: the pandas dataframe of the csv file
+    """
+    cache_dir = None
+    try:
+        cache_root = os.path.join(get_data_home(data_home=data_home), "skfair_cache")
+        cache_dir = os.path.join(cache_root, f"{name}-{_file_checksum(filepath)}")
+        if os.path.exists(os.path.join(cache_dir, "columns.json")):
+            return _read_column_cache(cache_dir)
+    except (OSError, ValueError):
+        # e.g. a data home that can not be created or a cache that another process is replacing
+        pass
+
+    df = pd.read_csv(filepath)
+    if cache_dir is not None:
+        _replace_column_cache(df, cache_dir, name)
+    return df
+
+
+def _replace_column_cache(df, cache_dir, name):
+    """
+    Writes the cache of a dataset to `cache_dir` and removes its caches of older files. An existing `cache_dir`
+    could not be read, so it is replaced as well.
+    """
+    cache_root = os.path.dirname(cache_dir)
+    try:
+        os.makedirs(cache_root, exist_ok=True)
+        for folder in os.listdir(cache_root):
+            # older caches of the dataset, the cache of the current file may be read by another process
+            if folder.startswith(f"{name}-") and os.path.join(cache_root, folder) != cache_dir:
+                shutil.rmtree(os.path.join(cache_root, folder), ignore_errors=True)
+        # written to a temporary folder first, such that concurrent loads never see a partial cache
+        tmp_dir = tempfile.mkdtemp(dir=cache_root)
+        stale_dir = None
+        try:
+            if _write_column_cache(df, tmp_dir):
+                if os.path.exists(cache_dir):
+                    # moved aside first, because a folder can not be renamed onto an existing one
+                    stale_dir = tempfile.mkdtemp(dir=cache_root)
+                    os.rename(cache_dir, os.path.join(stale_dir, "cache"))
+                os.rename(tmp_dir, cache_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if stale_dir is not None:
+                shutil.rmtree(stale_dir, ignore_errors=True)
+    except OSError:
+        pass
+
+
 def load_arrests(return_X_y=False, give_pandas=False):
     """
     Loads the arrests dataset which can serve as a benchmark for fairness. It is data on
@@ -40,7 +147,7 @@ def load_arrests(return_X_y=False, give_pandas=False):
     http://vincentarelbundock.github.io/Rdatasets/doc/carData/Arrests.html
     """
     filepath = resource_filename("skfair", os.path.join("data", "arrests.zip"))
-    df = pd.read_csv(filepath)
+    df = _read_csv_cached(filepath, "arrests")
     warnings.warn(FairnessWarning("You are about to play with an unfair dataset."))
 
     if give_pandas:
@@ -80,7 +187,7 @@ def load_boston(return_X_y=False, give_pandas=False):
           dtype='object')
     """
     filepath = resource_filename("skfair", os.path.join("data", "boston.zip"))
-    df = pd.read_csv(filepath)
+    df = _read_csv_cached(filepath, "boston")
     warnings.warn(FairnessWarning("You are about to play with a notorious dataset."))
 
     if give_pandas:
@@ -139,7 +246,7 @@ def fetch_adult(data_home=None, give_pandas=False, download_if_missing=True, ret
         print(f"downloading dataset to {data_home}")
         url = "https://github.com/koaning/scikit-fairness/raw/master/data/adult-census-income.zip"
         _download_file(url, filepath)
-    df = pd.read_csv(filepath)
+    df = _read_csv_cached(filepath, "adult", data_home=data_home)
     warnings.warn(FairnessWarning("You are about to play with an unfair dataset."))
     if give_pandas:
         return df
@@ -1,4 +1,5 @@
 from .demographic_parity import DemographicParityClassifier
 from .equal_opportunity import EqualOpportunityClassifier
+from .fairness_path import fairness_path
 
-__all__ = ["DemographicParityClassifier", "EqualOpportunityClassifier"]
+__all__ = ["DemographicParityClassifier", "EqualOpportunityClassifier", "fairness_path"]
@@ -1,12 +1,26 @@
+import time
+from contextlib import contextmanager
+
 import cvxpy as cp
+import ecos
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 from scipy.special._ufuncs import expit
 
 from sklearn.base import BaseEstimator
 from sklearn.linear_model._base import LinearClassifierMixin
 from sklearn.preprocessing import LabelEncoder
-from sklearn.utils import check_X_y, column_or_1d, check_array
+from sklearn.utils import (
+    check_X_y, column_or_1d, check_array, check_random_state, gen_batches, get_chunk_n_rows, _safe_indexing
+)
+from sklearn.utils.validation import _check_sample_weight, _num_samples, check_is_fitted
+from sklearn.utils.multiclass import _check_partial_fit_first_call
+
+from skfair.linear_model._solvers import (
+    augmented_lagrangian, design_dot, design_rdot, dot, logistic_cone_program, logistic_loss_and_grad,
+    primal_dual_step,
+)
 
 
 class _FairClassifier(BaseEstimator, LinearClassifierMixin):
@@ -18,6 +32,14 @@ class _FairClassifier(BaseEstimator, LinearClassifierMixin):
         fit_intercept=True,
         max_iter=100,
         train_sensitive_cols=False,
+        solver="cvxpy",
+        eta0=0.1,
+        compress_duplicates=False,
+        callback=None,
+        working_set_size=None,
+        working_set_tol=1e-3,
+        random_state=None,
+        cache_problem=False,
     ):
         self.sensitive_cols = sensitive_cols
         self.fit_intercept = fit_intercept
@@ -25,87 +47,496 @@ class _FairClassifier(BaseEstimator, LinearClassifierMixin):
         self.max_iter = max_iter
         self.train_sensitive_cols = train_sensitive_cols
         self.C = C
+        self.solver = solver
+        self.eta0 = eta0
+        self.compress_duplicates = compress_duplicates
+        self.callback = callback
+        self.working_set_size = working_set_size
+        self.working_set_tol = working_set_tol
+        self.random_state = random_state
+        self.cache_problem = cache_problem
+
+    def fit(self, X, y, sample_weight=None):
+        start = time.perf_counter()
+        sensitive, X, y = self._prepare_fit_data(X, y)
+        if sample_weight is not None:
+            sample_weight = _check_sample_weight(sample_weight, X)
+        self._fit_prepared(sensitive, X, y, sample_weight, validation_time=time.perf_counter() - start)
+        if self.callback is not None:
+            self.callback(self)
+        return self
+
+    def _fit_prepared(self, sensitive, X, y, sample_weight=None, validation_time=0.0):
+        """Fits on data that was already validated and split by `_prepare_fit_data`."""
+        self._start_fit_stats(validation_time)
+        # a following `partial_fit` starts new running statistics from the coefficients of this fit
+        if hasattr(self, "_n_samples_seen"):
+            del self._n_samples_seen
+        if self.compress_duplicates:
+            with self._timed("construction"):
+                sensitive, X, y, sample_weight = self._compress_duplicates(sensitive, X, y, sample_weight)
+        if self.working_set_size is not None and self.working_set_size < len(y):
+            self._solve_working_set(sensitive, X, y, sample_weight)
+        else:
+            self._solve(sensitive, X, y, sample_weight)
+        return self
+
+    def _solve_working_set(self, sensitive, X, y, sample_weight=None):
+        """
+        Solves the problem on a random working set of rows that doubles in size until the gradient of the
+        log likelihood on the working set matches the gradient on the full data up to `working_set_tol`.
+        The covariance statistics are computed on the full data, so that every solution satisfies the
+        fairness constraint on the full data.
+        """
+        if self.working_set_size < 1:
+            raise ValueError(f"working_set_size should be a positive integer, got {self.working_set_size}")
+        weights = np.ones(len(y)) if sample_weight is None else sample_weight
+        covariance = None
+        if self.covariance_threshold is not None:
+            with self._timed("construction"):
+                covariance = self.covariance_statistics(X, y, sensitive, sample_weight)
+
+        # rows without weight do not change the problem, so they are never added to the working set
+        order = np.flatnonzero(weights)
+        order = order[check_random_state(self.random_state).permutation(len(order))]
+        size = min(self.working_set_size, len(order))
+        while True:
+            working = np.sort(order[:size])
+            # scaled such that the working set has the same total weight, and regularization, as the full data
+            scale = weights.sum() / weights[working].sum()
+            self._solve(sensitive[working], X[working], y[working], weights[working] * scale, covariance)
+            if size == len(order):
+                break
+
+            with self._timed("verification"):
+                theta = np.r_[self.intercept_, self.coef_[0]] if self.fit_intercept else self.coef_[0]
+                design = self._design()
+                residual = weights * (expit(design_dot(X, theta, **design)) - y)
+                gradient_gap = (
+                    design_rdot(X, residual, **design) - design_rdot(X[working], residual[working], **design) * scale
+                ) / weights.sum()
+            if np.abs(gradient_gap).max() <= self.working_set_tol:
+                break
+            size = min(2 * size, len(order))
+        self.fit_stats_["working_set_size"] = size
 
-    def fit(self, X, y):
+    def _start_fit_stats(self, validation_time=0.0):
+        """
+        Resets `fit_stats_`, a dict with the wall time in seconds of every phase of the fit (validation of the
+        input, construction of the problem, compilation by cvxpy, the solver itself and the verification of a
+        working set on the full data), the solver, the number of iterations, the slack of the fairness
+        constraint per sensitive column (threshold minus absolute covariance, None without constraint), the
+        value of the penalized log likelihood and the size of the final working set when `working_set_size`
+        is set.
+        """
+        self.fit_stats_ = {
+            "time": {
+                "validation": validation_time, "construction": 0.0, "compilation": 0.0, "solve": 0.0,
+                "verification": 0.0,
+            },
+            "solver": None,
+            "n_iter": None,
+            "slack": None,
+            "objective": None,
+            "working_set_size": None,
+        }
+
+    @contextmanager
+    def _timed(self, phase):
+        start = time.perf_counter()
+        yield
+        self.fit_stats_["time"][phase] += time.perf_counter() - start
+
+    def _compress_duplicates(self, sensitive, X, y, sample_weight=None):
+        """Collapses identical (X, y, sensitive) rows into unique rows, weighted by their total sample weight."""
+        if sp.issparse(X):
+            raise ValueError("compress_duplicates=True does not support sparse input")
+        rows, index, inverse = np.unique(
+            np.c_[X, sensitive, y], axis=0, return_index=True, return_inverse=True
+        )
+        sample_weight = np.bincount(inverse.ravel(), weights=sample_weight, minlength=len(rows))
+        return sensitive[index], X[index], y[index], sample_weight
+
+    def partial_fit(self, X, y, classes=None):
+        """
+        Makes a single step of a stochastic primal-dual method on a chunk of data, such that the
+        classifier can be trained on data that does not fit in memory by calling it repeatedly,
+        for one or more passes over all chunks. The mean of the sensitive attributes and the
+        statistics of the covariance constraint are running estimates over all chunks seen so far.
+
+        :param X: a chunk of the training data, including the sensitive columns
+        :param y: the targets of the chunk
+        :param classes: all classes that can occur in y, required on the first call
+        :return: self
+        """
+        first_call = _check_partial_fit_first_call(self, classes)
+        reset = first_call or not hasattr(self, "_n_samples_seen")
+        if reset:
+            self._check_binary()
+            self._reset_partial_fit_state()
+        sensitive, X, y = self._split_data(X, y, reset=reset)
+        y = column_or_1d(y)
+        if len(np.setdiff1d(y, self.classes_)):
+            raise ValueError(
+                f"Mini-batch contains {np.unique(y)} while classes must be subset of {self.classes_}"
+            )
+        y = np.searchsorted(self.classes_, y)
+        if self._theta is None:
+            self._theta = self._initial_theta()
+            self._grad_sq_sum = np.zeros(self._n_design_features())
+
+        self._update_constraint_statistics(sensitive, X, y)
+        A, b = None, None
+        if self.covariance_threshold is not None:
+            A, b = self._linear_constraints(self._running_covariance_statistics())
+            if self._multipliers is None:
+                self._multipliers = np.zeros(len(A))
+
+        # the penalty is scaled such that it matches the penalty of `fit` on all data seen so far
+        inv_C = 1 / self.C * len(y) / self._n_samples_seen if self.penalty == "l1" else 0.0
+        _, grad = logistic_loss_and_grad(self._theta, X, y, inv_C, **self._design())
+        self._theta, self._grad_sq_sum, self._multipliers = primal_dual_step(
+            self._theta, grad, self._grad_sq_sum, self._multipliers, A, b, eta0=self.eta0
+        )
+        self.n_iter_ += 1
+        self._set_coef(self._theta)
+        return self
+
+    def _initial_theta(self):
+        """Continues from the coefficients of a previous `fit` when they exist, and starts from zeros otherwise."""
+        if not hasattr(self, "coef_") or self.coef_.shape[1] + int(self.fit_intercept) != self._n_design_features():
+            return np.zeros(self._n_design_features())
+        if self.fit_intercept:
+            return np.r_[self.intercept_, self.coef_[0]]
+        return self.coef_[0].copy()
+
+    def _reset_partial_fit_state(self):
+        self._theta, self._grad_sq_sum, self._multipliers = None, None, None
+        self._n_samples_seen, self._sensitive_sum = 0, 0.0
+        self._constraint_n, self._constraint_x_sum, self._constraint_xz_sum = 0, 0.0, 0.0
+        self.n_iter_ = 0
+
+    def _update_constraint_statistics(self, sensitive, X, y):
+        rows = self._constraint_rows(y)
+        self._n_samples_seen += len(y)
+        self._sensitive_sum = self._sensitive_sum + sensitive.sum(axis=0)
+        self._constraint_n += len(y[rows])
+        in_rows = self._constraint_weights(y)
+        self._constraint_x_sum = self._constraint_x_sum + design_rdot(X, in_rows, **self._design())
+        self._constraint_xz_sum = self._constraint_xz_sum + design_rdot(
+            X, in_rows[:, np.newaxis] * sensitive, **self._design()
+        )
+
+    def _running_covariance_statistics(self):
+        """The `covariance_statistics` of all chunks that `partial_fit` has seen so far."""
+        if self._constraint_n == 0:
+            return np.zeros(self._constraint_xz_sum.shape)
+        sensitive_mean = self._sensitive_sum / self._n_samples_seen
+        return (
+            self._constraint_xz_sum - np.outer(self._constraint_x_sum, sensitive_mean)
+        ) / self._constraint_n
+
+    def _prepare_fit_data(self, X, y):
+        """Validates the input and splits it into the sensitive columns, the design matrix and encoded labels."""
+        sensitive, X, y = self._split_data(X, y)
+
+        column_or_1d(y)
+        label_encoder = LabelEncoder().fit(y)
+        y = label_encoder.transform(y)
+        self.classes_ = label_encoder.classes_
+        self._check_binary()
+        return sensitive, X, y
+
+    def _split_data(self, X, y, reset=True):
+        """
+        Validates the input and splits off the sensitive columns. X is returned as validated, with the
+        sensitive columns, the solvers leave them out through the coefficients (see `_design`).
+        Unless `reset`, X should have the columns seen before, e.g. in the previous chunks of `partial_fit`.
+        """
         if self.penalty not in ["l1", "none"]:
             raise ValueError(
                 f"penalty should be either 'l1' or 'none', got {self.penalty}"
             )
+        if self.solver not in ["cvxpy", "lbfgs"]:
+            raise ValueError(
+                f"solver should be either 'cvxpy' or 'lbfgs', got {self.solver}"
+            )
 
-        self.sensitive_col_idx_ = self.sensitive_cols
+        sensitive_col_idx = self.sensitive_cols
         if isinstance(X, pd.DataFrame):
-            self.sensitive_col_idx_ = [
+            sensitive_col_idx = [
                 i for i, name in enumerate(X.columns) if name in self.sensitive_cols
             ]
-        X, y = check_X_y(X, y, accept_large_sparse=False)
+        X, y = check_X_y(
+            X, y, accept_sparse=["csr", "csc"], accept_large_sparse=False, multi_output=True,
+            dtype=[np.float64, np.float32],
+        )
+        if reset:
+            self.sensitive_col_idx_ = sensitive_col_idx
+            self.n_features_in_ = X.shape[1]
+        elif X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but this classifier was fitted with {self.n_features_in_}"
+            )
 
         sensitive = X[:, self.sensitive_col_idx_]
-        if not self.train_sensitive_cols:
-            X = np.delete(X, self.sensitive_col_idx_, axis=1)
-        X = self._add_intercept(X)
-
-        column_or_1d(y)
-        label_encoder = LabelEncoder().fit(y)
-        y = label_encoder.transform(y)
-        self.classes_ = label_encoder.classes_
+        if sp.issparse(sensitive):
+            sensitive = sensitive.toarray()
+        return sensitive, X, y
 
+    def _check_binary(self):
         if len(self.classes_) > 2:
             raise ValueError(
                 f"This solver needs samples of exactly 2 classes"
                 f" in the data, but the data contains {len(self.classes_)}: {self.classes_}"
             )
 
-        self._solve(sensitive, X, y)
-        return self
-
-    def constraints(self, y_hat, y_true, sensitive, n_obs):
+    def _constraint_rows(self, y_true):
+        """Returns the rows over which the covariance is constrained, as a boolean mask or a slice."""
         raise NotImplementedError(
-            "subclasses of _FairClassifier should implement constraints"
+            "subclasses of _FairClassifier should implement _constraint_rows"
         )
 
-    def _solve(self, sensitive, X, y):
-        n_obs, n_features = X.shape
-        theta = cp.Variable(n_features)
-        y_hat = X @ theta
+    def covariance_statistics(self, X, y_true, sensitive, sample_weight=None):
+        """
+        Returns the matrix M with shape (n_features, n_sensitive) for which the constrained
+        covariance equals theta @ M. Because the covariance is linear in theta it can be
+        precomputed, which keeps the size of the constraints independent of n_samples.
+        """
+        weights = self._constraint_weights(y_true, sample_weight)
+        centered = sensitive - np.average(sensitive, axis=0, weights=sample_weight)
+        return design_rdot(X, weights[:, np.newaxis] * centered, **self._design()) / weights.sum()
 
-        log_likelihood = cp.sum(
-            cp.multiply(y, y_hat)
-            - cp.log_sum_exp(
-                cp.hstack([np.zeros((n_obs, 1)), cp.reshape(y_hat, (n_obs, 1))]), axis=1
-            )
+    def _constraint_weights(self, y_true, sample_weight=None):
+        """
+        The sample weights within the rows of `_constraint_rows` and zero elsewhere, such that the statistics of
+        the constraint are products with all of X instead of with a copy of its constrained rows.
+        """
+        weights = np.zeros(len(y_true))
+        rows = self._constraint_rows(y_true)
+        weights[rows] = 1 if sample_weight is None else sample_weight[rows]
+        return weights
+
+    @staticmethod
+    def _drop_unweighted_rows(X, y, sample_weight=None):
+        """
+        Leaves out the rows without weight, which do not change the problem. Only the cone programs are made
+        smaller this way, the other solvers multiply with all of X, which avoids a copy of X.
+        """
+        if sample_weight is None or np.all(sample_weight):
+            return X, y, sample_weight
+        nonzero = sample_weight != 0
+        return X[nonzero], y[nonzero], sample_weight[nonzero]
+
+    def _linear_constraints(self, covariance):
+        """Writes |theta @ covariance| <= covariance_threshold as A @ theta <= b."""
+        A = np.r_[covariance.T, -covariance.T]
+        return A, np.full(len(A), self.covariance_threshold)
+
+    def _build_problem(self, sensitive, X, y, constrained, sample_weight=None, covariance=None):
+        """
+        Builds the cvxpy problem with the regularization strength and the covariance threshold
+        as parameters, such that it can be re-solved for other values without rebuilding it.
+        X holds all columns, only the trained columns are selected here and the intercept is added to the
+        expression instead of as a column of ones.
+        """
+        if constrained and covariance is None:
+            covariance = self.covariance_statistics(X, y, sensitive, sample_weight)
+        X, y, sample_weight = self._drop_unweighted_rows(X, y, sample_weight)
+        X = self._trained_columns(X)
+        offset = int(self.fit_intercept)
+        n_obs = X.shape[0]
+        theta = cp.Variable(X.shape[1] + offset)
+        inv_C = cp.Parameter(nonneg=True, value=1 / self.C)
+        covariance_threshold = cp.Parameter(nonneg=True)
+        y_hat = X @ theta[offset:] if X.shape[1] else np.zeros(n_obs)
+        if self.fit_intercept:
+            y_hat = y_hat + theta[0]
+
+        log_likelihoods = cp.multiply(y, y_hat) - cp.log_sum_exp(
+            cp.hstack([np.zeros((n_obs, 1)), cp.reshape(y_hat, (n_obs, 1))]), axis=1
         )
+        if sample_weight is None:
+            log_likelihood = cp.sum(log_likelihoods)
+        else:
+            log_likelihood = sample_weight @ log_likelihoods
         if self.penalty == "l1":
-            log_likelihood -= cp.sum((1 / self.C) * cp.norm(theta[1:]))
+            log_likelihood -= cp.sum(inv_C * cp.norm(theta[1:]))
 
-        constraints = self.constraints(y_hat, y, sensitive, n_obs)
+        constraints = []
+        if constrained:
+            covariance_threshold.value = self.covariance_threshold
+            constraints = [cp.abs(theta @ covariance) <= covariance_threshold]
 
         problem = cp.Problem(cp.Maximize(log_likelihood), constraints)
-        problem.solve(max_iters=self.max_iter)
+        return problem, theta, inv_C, covariance_threshold
+
+    def _solve_lbfgs(self, X, y, sample_weight=None, covariance=None):
+        inv_C = 1 / self.C if self.penalty == "l1" else 0.0
+        A, b = None, None
+        if covariance is not None:
+            A, b = self._linear_constraints(covariance)
+
+        with self._timed("solve"):
+            theta, self.n_iter_ = augmented_lagrangian(
+                lambda theta: logistic_loss_and_grad(theta, X, y, inv_C, sample_weight, **self._design()),
+                np.zeros(self._n_design_features()), A, b, max_iter=self.max_iter,
+            )
+        self._set_coef(theta)
+
+        loss, _ = logistic_loss_and_grad(theta, X, y, inv_C, sample_weight, **self._design())
+        n_obs = len(y) if sample_weight is None else sample_weight.sum()
+        self.fit_stats_.update(
+            solver="lbfgs",
+            n_iter=self.n_iter_,
+            slack=None if A is None else b[:len(A) // 2] - np.abs(A[:len(A) // 2] @ theta),
+            objective=-loss * n_obs,
+        )
+
+    def _solve_cone_program(self, X, y, sample_weight=None, covariance=None):
+        """
+        Solves the same problem as cvxpy, with the same conic solver, from a cone program whose structure is
+        cached for the shape of the data, such that a refit only swaps the data instead of compiling again.
+        """
+        inv_C = 1 / self.C if self.penalty == "l1" else 0.0
+        A, b = None, None
+        if covariance is not None:
+            A, b = self._linear_constraints(covariance)
+
+        with self._timed("construction"):
+            X, y, sample_weight = self._drop_unweighted_rows(X, y, sample_weight)
+            c, G, h, dims = logistic_cone_program(X, y, sample_weight, inv_C, A, b, **self._design())
+        with self._timed("solve"):
+            solution = ecos.solve(c, G, h, dims, max_iters=self.max_iter, verbose=False)
+
+        exit_flag = solution["info"]["exitFlag"]
+        if exit_flag in [1, 11]:
+            raise ValueError("problem was found to be infeasible")
+        if exit_flag in [2, 12]:
+            raise ValueError("problem was found to be unbounded")
+        if exit_flag < 0:
+            raise cp.error.SolverError(f"Solver 'ECOS' failed with exit flag {exit_flag}")
+
+        theta = solution["x"][:self._n_design_features()]
+        self.n_iter_ = solution["info"]["iter"]
+        self._set_coef(theta)
+        self.fit_stats_.update(
+            solver="ECOS",
+            n_iter=self.n_iter_,
+            slack=None if A is None else b[:len(A) // 2] - np.abs(A[:len(A) // 2] @ theta),
+            objective=-solution["info"]["pcost"],
+        )
+
+    def _solve(self, sensitive, X, y, sample_weight=None, covariance=None):
+        """
+        Solves the problem on (X, y). The covariance statistics are computed from the same data, unless they
+        are given, e.g. because they were computed on the full data while X is a working set.
+        """
+        if covariance is None and self.covariance_threshold is not None:
+            with self._timed("construction"):
+                covariance = self.covariance_statistics(X, y, sensitive, sample_weight)
+
+        if self.solver == "lbfgs":
+            return self._solve_lbfgs(X, y, sample_weight, covariance)
+        if self.cache_problem:
+            return self._solve_cone_program(X, y, sample_weight, covariance)
+        with self._timed("construction"):
+            problem, theta, _, _ = self._build_problem(
+                sensitive, X, y, constrained=covariance is not None, sample_weight=sample_weight,
+                covariance=covariance,
+            )
+        self._solve_problem(problem, theta)
+
+    def _solve_problem(self, problem, theta, **solver_kwargs):
+        start = time.perf_counter()
+        problem.solve(max_iters=self.max_iter, **solver_kwargs)
+        elapsed = time.perf_counter() - start
 
         if problem.status in ["infeasible", "unbounded"]:
             raise ValueError(f"problem was found to be {problem.status}")
 
         self.n_iter_ = problem.solver_stats.num_iters
+        self._set_coef(theta.value)
 
+        # cvxpy reports the time of the solver itself, the rest of `solve` is spent compiling the problem
+        solve_time = min(problem.solver_stats.solve_time or elapsed, elapsed)
+        self.fit_stats_["time"]["compilation"] += elapsed - solve_time
+        self.fit_stats_["time"]["solve"] += solve_time
+        slack = None
+        if problem.constraints:
+            constraint = problem.constraints[0]
+            slack = constraint.args[1].value - constraint.args[0].value
+        self.fit_stats_.update(
+            solver=problem.solver_stats.solver_name, n_iter=self.n_iter_, slack=slack, objective=problem.value
+        )
+
+    def _set_coef(self, theta):
         if self.fit_intercept:
-            self.coef_ = theta.value[np.newaxis, 1:]
-            self.intercept_ = theta.value[0:1]
+            self.coef_ = theta[np.newaxis, 1:]
+            self.intercept_ = theta[0:1]
         else:
-            self.coef_ = theta.value[np.newaxis, :]
+            self.coef_ = theta[np.newaxis, :]
             self.intercept_ = np.array([0.0])
 
+        # coefficients for all input columns, with zeros for the sensitive columns that were left out of
+        # the fit, such that prediction is a single product with X instead of a copy of X without them
+        self._expanded_coef = self.coef_[0]
+        if not self.train_sensitive_cols:
+            self._expanded_coef = np.zeros(self.n_features_in_)
+            self._expanded_coef[self._kept_cols()] = self.coef_[0]
+
     def predict_proba(self, X):
         decision = self.decision_function(X)
-        decision_2d = np.c_[-decision, decision]
-        return expit(decision_2d)
+        proba = np.empty((len(decision), 2))
+        proba[:, 0], proba[:, 1] = -decision, decision
+        return expit(proba, out=proba)
 
     def decision_function(self, X):
-        X = check_array(X)
+        """
+        Computes the distance to the decision boundary. Large inputs are processed in chunks of rows,
+        whose size follows the `working_memory` setting of scikit-learn. Dataframes are converted to an
+        array one chunk at a time, so that a full copy of the data is never made.
+        """
+        check_is_fitted(self, "coef_")
+        is_dataframe = isinstance(X, pd.DataFrame)
+        if not is_dataframe:
+            X = check_array(X, accept_sparse=["csr", "csc"], dtype=[np.float64, np.float32])
+        n_samples = _num_samples(X)
+        chunk_n_rows = get_chunk_n_rows(row_bytes=8 * self.n_features_in_, max_n_rows=n_samples)
 
-        if not self.train_sensitive_cols:
-            X = np.delete(X, self.sensitive_col_idx_, axis=1)
-        return super().decision_function(X)
+        scores = np.empty(n_samples)
+        for batch in gen_batches(n_samples, chunk_n_rows):
+            X_batch = _safe_indexing(X, batch)
+            if is_dataframe:
+                X_batch = check_array(X_batch, dtype=[np.float64, np.float32])
+            if X_batch.shape[1] != self.n_features_in_:
+                raise ValueError(
+                    f"X has {X_batch.shape[1]} features, but this classifier was fitted with {self.n_features_in_}"
+                )
+            scores[batch] = dot(X_batch, self._expanded_coef)
+        scores += self.intercept_[0]
+        return scores
 
-    def _add_intercept(self, X):
-        if self.fit_intercept:
-            return np.c_[np.ones(len(X)), X]
+    def _kept_cols(self):
+        return np.setdiff1d(np.arange(self.n_features_in_), self.sensitive_col_idx_)
+
+    def _design(self):
+        """
+        The design matrix of the problem are the columns of X that are trained on, preceded by a column of ones
+        for the intercept. Returns its definition as keyword arguments of `design_dot` and `design_rdot`, which
+        multiply with it without building it.
+        """
+        return {"columns": None if self.train_sensitive_cols else self._kept_cols(), "fit_intercept": self.fit_intercept}
+
+    def _n_design_features(self):
+        n_columns = self.n_features_in_ if self.train_sensitive_cols else len(self._kept_cols())
+        return n_columns + int(self.fit_intercept)
+
+    def _trained_columns(self, X):
+        """
+        Returns the columns of X the coefficients are fitted on, which is X itself when the sensitive columns are
+        trained on. The intercept is not added as a column, such that sparse X keeps its stored elements as is.
+        """
+        if self.train_sensitive_cols:
+            return X
+        return X[:, self._kept_cols()]
@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.multiclass import OneVsRestClassifier, _fit_binary
+from sklearn.preprocessing import LabelBinarizer
+from sklearn.utils.validation import _check_sample_weight
+
+
+def _fit_binary_prepared(estimator, input_attributes, sensitive, X, y, sample_weight, validation_time):
+    estimator = clone(estimator)
+    for name, value in input_attributes.items():
+        setattr(estimator, name, value)
+    estimator.classes_ = np.array([0, 1])
+    return estimator._fit_prepared(sensitive, X, y, sample_weight, validation_time)
+
+
+class _FairOneVsRestClassifier(OneVsRestClassifier):
+    """
+    A `OneVsRestClassifier` for the fair classifiers that validates the data and splits off the sensitive columns
+    once for all classes instead of once per class. The joblib workers share the validated data through memory
+    mapping instead of each receiving and validating a copy of X. It also passes `sample_weight` on to the binary
+    classifiers.
+
+    The `fit_stats_` of every binary classifier report the time of the shared validation, and the `callback`
+    of the classifiers is called for every fitted binary classifier in the main process.
+    """
+
+    def fit(self, X, y, sample_weight=None):
+        start = time.perf_counter()
+        preprocessor = clone(self.estimator)
+        sensitive, X_valid, _ = preprocessor._split_data(X, y)
+        input_attributes = {
+            "sensitive_col_idx_": preprocessor.sensitive_col_idx_,
+            "n_features_in_": preprocessor.n_features_in_,
+        }
+        if sample_weight is not None:
+            sample_weight = _check_sample_weight(sample_weight, X_valid)
+        validation_time = time.perf_counter() - start
+
+        self.label_binarizer_ = LabelBinarizer(sparse_output=True)
+        Y = self.label_binarizer_.fit_transform(y).tocsc()
+        self.classes_ = self.label_binarizer_.classes_
+
+        jobs = []
+        for i, column in enumerate(col.toarray().ravel() for col in Y.T):
+            if len(np.unique(column)) == 1:
+                # a constant predictor, which does not need the preprocessed data
+                jobs.append(delayed(_fit_binary)(
+                    self.estimator, X, column, classes=[f"not {self.classes_[i]}", self.classes_[i]]
+                ))
+            else:
+                jobs.append(delayed(_fit_binary_prepared)(
+                    self.estimator, input_attributes, sensitive, X_valid, column, sample_weight, validation_time
+                ))
+        # joblib memory maps large arrays, so that the workers share a single copy of the validated data
+        self.estimators_ = Parallel(n_jobs=self.n_jobs)(jobs)
+
+        callback = self.estimator.callback
+        if callback is not None:
+            for estimator in self.estimators_:
+                if hasattr(estimator, "fit_stats_"):
+                    callback(estimator)
+
+        self.n_features_in_ = preprocessor.n_features_in_
+        return self
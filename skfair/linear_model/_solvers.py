@@ -0,0 +1,226 @@
+from functools import lru_cache
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import minimize
+from scipy.special import expit
+from sklearn.utils.extmath import safe_sparse_dot
+
+
+def dot(X, v):
+    """
+    Computes X @ v in the precision of X, casting the (small) v instead of X, such that a float32 or
+    memory mapped X is never upcast to a float64 copy. The result is returned as float64.
+    """
+    return np.asarray(safe_sparse_dot(X, v.astype(X.dtype, copy=False)), dtype=np.float64)
+
+
+def design_dot(X, theta, columns=None, fit_intercept=False):
+    """
+    Computes D @ theta for the design matrix D that holds the given columns of X (all columns when None),
+    preceded by a column of ones when `fit_intercept`, without building D. The coefficients of the other
+    columns are zero, so X itself is multiplied and never copied.
+    """
+    offset = int(fit_intercept)
+    coef = theta[offset:]
+    if columns is not None:
+        coef = np.zeros(X.shape[1])
+        coef[columns] = theta[offset:]
+    y_hat = dot(X, coef)
+    if fit_intercept:
+        y_hat += theta[0]
+    return y_hat
+
+
+def design_rdot(X, r, columns=None, fit_intercept=False):
+    """Computes D.T @ r for the design matrix D of `design_dot`, for a vector or a matrix r, without building D."""
+    product = dot(X.T, r)
+    if columns is not None:
+        product = product[columns]
+    if fit_intercept:
+        product = np.concatenate([np.sum(r, axis=0)[np.newaxis], product])
+    return product
+
+
+def logistic_loss_and_grad(theta, X, y, inv_C=0.0, sample_weight=None, columns=None, fit_intercept=False):
+    """
+    The mean negative log likelihood of a logistic regression plus `inv_C / n` times the l2 norm of
+    theta[1:], the same objective (up to scaling by n) as the cvxpy formulation of `_FairClassifier`.
+    With sample weights the mean is weighted and n is the sum of the weights. `columns` and
+    `fit_intercept` define the design matrix as in `design_dot`.
+    Only vectors of length n_samples are allocated.
+    """
+    y_hat = design_dot(X, theta, columns, fit_intercept)
+    if sample_weight is None:
+        n_obs = X.shape[0]
+        loss = (np.logaddexp(0, y_hat).sum() - y @ y_hat) / n_obs
+        grad = design_rdot(X, expit(y_hat) - y, columns, fit_intercept) / n_obs
+    else:
+        n_obs = sample_weight.sum()
+        loss = sample_weight @ (np.logaddexp(0, y_hat) - y * y_hat) / n_obs
+        grad = design_rdot(X, sample_weight * (expit(y_hat) - y), columns, fit_intercept) / n_obs
+    if inv_C:
+        # smoothed at zero, the norm itself is not differentiable there
+        norm = np.sqrt(theta[1:] @ theta[1:] + 1e-12)
+        loss += inv_C * norm / n_obs
+        grad[1:] += inv_C * theta[1:] / (norm * n_obs)
+    return loss, grad
+
+
+@lru_cache(maxsize=8)
+def _logistic_cone_structure(n_obs, n_coefs, n_constraints, penalized):
+    """
+    The part of the cone program of `logistic_cone_program` that only depends on its shape: the columns of G
+    of the auxiliary variables, h without the bounds of the constraints, and the dimensions of the cones.
+    It holds no data, so it is cached for refits on data of the same shape.
+    """
+    n_linear = n_obs + n_constraints
+    exp_start = n_linear + (n_coefs if penalized else 0)
+    n_rows = exp_start + 6 * n_obs
+    obs = np.arange(n_obs)
+    t, u, v = obs, n_obs + obs, 2 * n_obs + obs
+    exp_rows = exp_start + 6 * obs
+
+    # u_i + v_i <= 1, with u_i >= exp(-t_i) and v_i >= exp(y_hat_i - t_i), bounds t_i by log(1 + exp(y_hat_i))
+    rows = [obs, obs, exp_rows, exp_rows + 1, exp_rows + 3, exp_rows + 4]
+    cols = [u, v, t, u, t, v]
+    values = [np.ones(n_obs), np.ones(n_obs), np.ones(n_obs), -np.ones(n_obs), np.ones(n_obs), -np.ones(n_obs)]
+    if penalized:
+        # s >= ||theta[1:]||, the rows of theta[1:] in this cone are in the columns of theta
+        rows.append([n_linear])
+        cols.append([3 * n_obs])
+        values.append([-1.0])
+    G = sp.csc_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n_rows, 3 * n_obs + int(penalized)),
+    )
+
+    h = np.zeros(n_rows)
+    h[:n_obs] = 1
+    h[exp_rows + 2] = 1
+    h[exp_rows + 5] = 1
+    h.flags.writeable = False
+    dims = {"l": n_linear, "q": [n_coefs] if penalized else [], "e": 2 * n_obs}
+    return G, h, dims
+
+
+def logistic_cone_program(X, y, sample_weight=None, inv_C=0.0, A=None, b=None, columns=None, fit_intercept=False):
+    """
+    Writes the problem of `logistic_loss_and_grad`, times n, subject to `A @ theta <= b` as the cone program
+    min c @ x subject to h - G @ x in K of the conic solver ECOS, with x = (theta, t, u, v, s) and K made of
+    the nonnegative orthant, a second-order cone for the penalty and two exponential cones per sample.
+    `columns` and `fit_intercept` define the design matrix as in `design_dot`.
+
+    Only the columns of G for theta and the bounds of the constraints depend on the data, the rest comes from
+    a cache keyed by the shape of the problem, so a refit on data of the same shape only swaps the data.
+
+    :return: tuple (c, G, h, dims) with the arguments of `ecos.solve`, theta are the first entries of x
+    """
+    n_obs = X.shape[0]
+    offset = int(fit_intercept)
+    n_coefs = offset + (X.shape[1] if columns is None else len(columns))
+    n_constraints = 0 if A is None else len(A)
+    penalized = bool(inv_C)
+    G_aux, h, dims = _logistic_cone_structure(n_obs, n_coefs, n_constraints, penalized)
+    exp_start = dims["l"] + sum(dims["q"])
+
+    trained = sp.coo_matrix(X if columns is None else X[:, columns])
+    rows = [exp_start + 6 * trained.row + 3]
+    cols = [trained.col + offset]
+    values = [-trained.data.astype(np.float64)]
+    if fit_intercept:
+        rows.append(exp_start + 6 * np.arange(n_obs) + 3)
+        cols.append(np.zeros(n_obs, dtype=int))
+        values.append(-np.ones(n_obs))
+    if n_constraints:
+        constraint_rows, constraint_cols = np.indices(A.shape)
+        rows.append(n_obs + constraint_rows.ravel())
+        cols.append(constraint_cols.ravel())
+        values.append(A.ravel())
+    if penalized:
+        rows.append(dims["l"] + np.arange(1, n_coefs))
+        cols.append(np.arange(1, n_coefs))
+        values.append(-np.ones(n_coefs - 1))
+    G_theta = sp.csc_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(G_aux.shape[0], n_coefs)
+    )
+    G = sp.hstack([G_theta, G_aux], format="csc")
+
+    weights = np.ones(n_obs) if sample_weight is None else sample_weight
+    c = np.concatenate([
+        -design_rdot(X, weights * y, columns, fit_intercept), weights, np.zeros(2 * n_obs), [inv_C] * penalized
+    ])
+    h = h.copy()
+    if n_constraints:
+        h[n_obs:dims["l"]] = b
+    return c, G, h, dims
+
+
+def augmented_lagrangian(fun, theta0, A=None, b=None, max_iter=100, max_outer_iter=20, tol=1e-6):
+    """
+    Minimizes a smooth function subject to linear inequality constraints `A @ theta <= b` using the
+    augmented Lagrangian method, with L-BFGS-B for the unconstrained subproblems.
+
+    :param fun: function theta -> (value, gradient)
+    :param theta0: starting point
+    :param A: matrix of the constraints, None for an unconstrained problem
+    :param b: right hand side of the constraints
+    :param max_iter: maximum number of L-BFGS-B iterations per subproblem
+    :param max_outer_iter: maximum number of multiplier updates
+    :param tol: maximum allowed constraint violation
+    :return: tuple (theta, n_iter) with the solution and the total number of L-BFGS-B iterations
+    """
+    options = {"maxiter": max_iter, "gtol": 1e-10, "ftol": 1e-14}
+    if A is None or len(A) == 0:
+        result = minimize(fun, theta0, jac=True, method="L-BFGS-B", options=options)
+        return result.x, result.nit
+
+    multipliers, rho = np.zeros(len(b)), 10.0
+    theta, n_iter, prev_violation = theta0, 0, np.inf
+
+    def lagrangian(theta):
+        value, grad = fun(theta)
+        shifted = np.maximum(0, multipliers + rho * (A @ theta - b))
+        return value + (shifted @ shifted - multipliers @ multipliers) / (2 * rho), grad + A.T @ shifted
+
+    for _ in range(max_outer_iter):
+        result = minimize(lagrangian, theta, jac=True, method="L-BFGS-B", options=options)
+        theta, n_iter = result.x, n_iter + result.nit
+
+        slack = A @ theta - b
+        violation = max(slack.max(), 0)
+        new_multipliers = np.maximum(0, multipliers + rho * slack)
+        multipliers_change = np.abs(new_multipliers - multipliers).max()
+        multipliers = new_multipliers
+        if violation <= tol and multipliers_change <= 1e-4 * (1 + multipliers.max()):
+            break
+        if violation > 0.25 * prev_violation:
+            rho *= 10
+        prev_violation = violation
+    return theta, n_iter
+
+
+def primal_dual_step(theta, grad, grad_sq_sum, multipliers, A=None, b=None, eta0=0.1, rho=100.0):
+    """
+    Makes one step of a stochastic primal-dual method for minimizing a function subject to linear
+    inequality constraints `A @ theta <= b`, given a stochastic estimate of the gradient of the function.
+    The primal step follows the gradient of the augmented Lagrangian with AdaGrad step sizes, the dual
+    step is the usual multiplier update of the augmented Lagrangian method.
+
+    :param theta: the current solution
+    :param grad: (stochastic) gradient of the function in theta
+    :param grad_sq_sum: sum of the squared gradients of all previous steps, used for the step sizes
+    :param multipliers: the current Lagrange multipliers, one per constraint
+    :param A: matrix of the constraints, None for an unconstrained problem
+    :param b: right hand side of the constraints
+    :param eta0: the learning rate
+    :param rho: the penalty parameter of the augmented Lagrangian
+    :return: tuple (theta, grad_sq_sum, multipliers) after the step
+    """
+    if A is not None and len(A):
+        grad = grad + A.T @ np.maximum(0, multipliers + rho * (A @ theta - b))
+    grad_sq_sum = grad_sq_sum + grad * grad
+    theta = theta - eta0 * grad / np.sqrt(grad_sq_sum + 1e-12)
+    if A is not None and len(A):
+        multipliers = np.maximum(0, multipliers + rho * (A @ theta - b))
+    return theta, grad_sq_sum, multipliers
@@ -1,10 +1,9 @@
-import numpy as np
-import cvxpy as cp
 from sklearn.base import BaseEstimator
 from sklearn.linear_model._base import LinearClassifierMixin
-from sklearn.multiclass import OneVsRestClassifier, OneVsOneClassifier
+from sklearn.multiclass import OneVsOneClassifier
 
 from skfair.linear_model._fairclassifier import _FairClassifier
+from skfair.linear_model._multiclass import _FairOneVsRestClassifier
 
 
 class EqualOpportunityClassifier(BaseEstimator, LinearClassifierMixin):
@@ -41,14 +40,38 @@ class EqualOpportunityClassifier(BaseEstimator, LinearClassifierMixin):
     :param fit_intercept: Specifies if a constant (a.k.a. bias or intercept) should be added to the decision function.
     :param max_iter: Maximum number of iterations taken for the solvers to converge.
     :param train_sensitive_cols: Indicates whether the model should use the sensitive columns in the fit step.
-    :param multi_class: The method to use for multiclass predictions
+    :param solver:
+        Either 'cvxpy', which solves the problem with a conic solver, or 'lbfgs', which solves the same problem
+        with an augmented Lagrangian method on top of scipy's L-BFGS-B. The latter only needs memory in the
+        order of the size of the data and scales to millions of samples.
+    :param eta0:
+        The learning rate of `partial_fit`, which trains the classifier on one chunk of data at a time with a
+        stochastic primal-dual method instead of solving the problem on all data at once.
+    :param compress_duplicates:
+        Collapse identical rows (including the target and the sensitive columns) into a single row weighted
+        by the number of duplicates before solving, which shrinks the problem for data with many repeated rows.
+    :param callback:
+        Function that is called with every fitted binary classifier, e.g. to record its `fit_stats_`, a dict with
+        the wall time of every phase of the fit, the solver, the number of iterations, the slack of the fairness
+        constraint and the objective value. Inside the one-vs-rest wrapper it is called in the main process.
+    :param working_set_size:
+        If set, the problem is first solved on a random subsample of this many rows, which doubles in size until the
+        gradient of the log likelihood on the subsample is within `working_set_tol` of the gradient on the full data.
+        The fairness constraint is always computed on the full data. Useful to speed up fits on very large data.
+    :param working_set_tol: Tolerance on the gradient difference that decides when the working set is large enough.
+    :param random_state: Seed or `np.random.RandomState` that selects the rows of the working set.
+    :param cache_problem:
+        Solve the cvxpy problem as a cone program whose structure is cached for the shape of the data and the
+        options, so that refits on data of the same shape only swap the data and skip the compilation by cvxpy.
+        The cache holds no training data. Only used with solver='cvxpy'.
+    :param multi_class: The method to use for multiclass predictions, `sample_weight` is only supported for "ovr"
     :param n_jobs: The amount of parallel jobs thata should be used to fit multiclass models
 
     """
 
     def __new__(cls, *args, multi_class="ovr", n_jobs=1, **kwargs):
 
-        multiclass_meta = {"ovr": OneVsRestClassifier, "ovo": OneVsOneClassifier}[
+        multiclass_meta = {"ovr": _FairOneVsRestClassifier, "ovo": OneVsOneClassifier}[
             multi_class
         ]
         return multiclass_meta(
@@ -62,20 +85,8 @@ class _EqualOpportunityClassifier(_FairClassifier):
         self.positive_target = positive_target
         self.covariance_threshold = covariance_threshold
 
-    def constraints(self, y_hat, y_true, sensitive, n_obs):
-        if self.covariance_threshold is not None:
-            n_obs = len(y_true[y_true == self.positive_target])
-            dec_boundary_cov = (
-                y_hat[y_true == self.positive_target]
-                @ (
-                    sensitive[y_true == self.positive_target]
-                    - np.mean(sensitive, axis=0)
-                )
-                / n_obs
-            )
-            return [cp.abs(dec_boundary_cov) <= self.covariance_threshold]
-        else:
-            return []
+    def _constraint_rows(self, y_true):
+        return y_true == self.positive_target
 
     @classmethod
     def _get_param_names(cls):
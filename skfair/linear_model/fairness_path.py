@@ -0,0 +1,99 @@
+import numpy as np
+from sklearn.base import clone
+from sklearn.multiclass import OneVsOneClassifier, OneVsRestClassifier
+
+from skfair.linear_model._fairclassifier import _FairClassifier
+from skfair.linear_model._solvers import design_dot
+from skfair.metrics.p_percent_score import _p_percent_from_counts
+from skfair.metrics.utils import binary_group_counts
+
+
+def _p_percent_scores(sensitive, y_hat):
+    scores = []
+    for i in range(sensitive.shape[1]):
+        try:
+            counts = binary_group_counts(sensitive[:, i], y_hat, positive_target=True)
+        except ValueError:
+            # the p% score is only defined for binary sensitive attributes
+            scores.append(np.nan)
+        else:
+            scores.append(_p_percent_from_counts(*counts, sensitive_column=i, positive_target=1))
+    return scores
+
+
+def _check_path_settings(estimator):
+    """Raises for the settings of the estimator that the path, which re-solves one cvxpy problem, ignores."""
+    if estimator.solver != "cvxpy":
+        raise ValueError(f"fairness_path only supports solver='cvxpy', got {estimator.solver}")
+    if estimator.working_set_size is not None:
+        raise ValueError(f"fairness_path does not support working_set_size, got {estimator.working_set_size}")
+    if estimator.compress_duplicates:
+        raise ValueError("fairness_path does not support compress_duplicates")
+    if estimator.cache_problem:
+        raise ValueError("fairness_path does not support cache_problem, it always re-solves one compiled problem")
+
+
+def fairness_path(estimator, X, y, param_range, param_name="covariance_threshold"):
+    """
+    Fits a fair classifier for every value in `param_range` while building the optimization
+    problem only once. The covariance threshold and the inverse regularization strength enter
+    the problem as parameters, so every point on the path re-solves the same compiled problem
+    starting from the previous solution. This is useful to draw an accuracy-vs-fairness curve.
+
+    Only binary classification problems are supported. The path is always solved with cvxpy on all
+    rows of X, so the estimator should use `solver="cvxpy"`, `working_set_size=None` and
+    `compress_duplicates=False` and `cache_problem=False`, other settings raise a ValueError.
+
+    :param estimator: a `DemographicParityClassifier` or `EqualOpportunityClassifier`
+    :param X: the training data, including the sensitive columns
+    :param y: the training targets
+    :param param_range: the (numeric) values of the parameter
+    :param param_name: the parameter to sweep, either 'covariance_threshold' or 'C', which needs `penalty="l1"`
+    :return: a dict with for every point on the path the `coef` (n_points, n_features),
+        the `intercept` (n_points,), the `objective` value (log likelihood minus penalty) and
+        the `p_percent_score` (n_points, n_sensitive_cols) of the predictions on X. The p% score
+        is NaN for sensitive columns that are not binary.
+
+    :Example:
+
+    >>> from skfair.linear_model import DemographicParityClassifier
+    >>> clf = DemographicParityClassifier(covariance_threshold=None, sensitive_cols=["x1"])  # doctest: +SKIP
+    >>> path = fairness_path(clf, X, y, param_range=[1.0, 0.1, 0.01])  # doctest: +SKIP
+    """
+    if isinstance(estimator, (OneVsRestClassifier, OneVsOneClassifier)):
+        estimator = estimator.estimator
+    if not isinstance(estimator, _FairClassifier):
+        raise ValueError(f"estimator should be a fair classifier, got {type(estimator).__name__}")
+    if param_name not in ["covariance_threshold", "C"]:
+        raise ValueError(f"param_name should be either 'covariance_threshold' or 'C', got {param_name}")
+    if param_name == "C" and estimator.penalty == "none":
+        raise ValueError("param_name='C' needs penalty='l1', without a penalty C does not change the problem")
+    _check_path_settings(estimator)
+
+    estimator = clone(estimator)
+    sensitive, X_fit, y_fit = estimator._prepare_fit_data(X, y)
+    estimator._start_fit_stats()
+    constrained = param_name == "covariance_threshold" or estimator.covariance_threshold is not None
+    problem, theta, inv_C, covariance_threshold = estimator._build_problem(
+        sensitive, X_fit, y_fit, constrained=constrained
+    )
+
+    coefs, intercepts, objectives, p_percent_scores = [], [], [], []
+    for value in param_range:
+        if param_name == "C":
+            inv_C.value = 1 / value
+        else:
+            covariance_threshold.value = value
+        estimator._solve_problem(problem, theta, warm_start=True)
+
+        coefs.append(estimator.coef_[0])
+        intercepts.append(estimator.intercept_[0])
+        objectives.append(problem.value)
+        p_percent_scores.append(_p_percent_scores(sensitive, design_dot(X_fit, theta.value, **estimator._design()) > 0))
+
+    return {
+        "coef": np.array(coefs),
+        "intercept": np.array(intercepts),
+        "objective": np.array(objectives),
+        "p_percent_score": np.array(p_percent_scores),
+    }
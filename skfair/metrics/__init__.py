@@ -2,10 +2,30 @@ from .equal_opportunity_score import equal_opportunity_score
 from .p_percent_score import p_percent_score
 from .false_discovery_score import false_discovery_score
 from .false_positive_score import false_positive_score
+from .fairness_scorer import make_fairness_scorer
+from .bootstrap import bootstrap_fairness_score
+from .streaming import (
+    GroupConfusionCounts,
+    PPercentAccumulator,
+    EqualOpportunityAccumulator,
+    FalsePositiveAccumulator,
+    FalseDiscoveryAccumulator,
+    FairnessReportAccumulator,
+    evaluate_sharded,
+)
 
 __all__ = [
     "equal_opportunity_score",
     "p_percent_score",
     "false_discovery_score",
-    "false_positive_score"
+    "false_positive_score",
+    "make_fairness_scorer",
+    "bootstrap_fairness_score",
+    "GroupConfusionCounts",
+    "PPercentAccumulator",
+    "EqualOpportunityAccumulator",
+    "FalsePositiveAccumulator",
+    "FalseDiscoveryAccumulator",
+    "FairnessReportAccumulator",
+    "evaluate_sharded",
 ]
@@ -0,0 +1,99 @@
+import numpy as np
+from sklearn.utils import check_random_state
+
+from skfair.metrics.equal_opportunity_score import equal_opportunity_score
+from skfair.metrics.p_percent_score import p_percent_score
+
+
+def _cell_counts(sensitive_col, y_hat, y_true, positive_target):
+    """Counts the samples in every (z, y_true == positive_target, y_hat == positive_target) cell."""
+    sensitive_col = np.asarray(sensitive_col)
+    z1 = sensitive_col == 1
+    if np.count_nonzero(z1) + np.count_nonzero(sensitive_col == 0) != len(sensitive_col):
+        raise ValueError(
+            f"bootstrap_fairness_score only supports binary indicator columns for `column`. "
+            f"Found values {np.unique(sensitive_col)}"
+        )
+    cells = z1.astype(np.int8) * 4
+    if y_true is not None:
+        cells += (np.asarray(y_true) == positive_target).astype(np.int8) * 2
+    cells += np.asarray(y_hat) == positive_target
+    return np.bincount(cells, minlength=8).reshape(2, 2, 2)
+
+
+def _p_percent_from_cells(cells):
+    n_z0, n_z1 = cells.sum(axis=(-1, -2)).T
+    n_pos_z0, n_pos_z1 = cells[..., 1].sum(axis=-1).T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_y1_z0, p_y1_z1 = n_pos_z0 / n_z0, n_pos_z1 / n_z1
+        score = np.minimum(p_y1_z1 / p_y1_z0, p_y1_z0 / p_y1_z1)
+    score = np.where(np.isnan(score), 1.0, score)
+    return np.where((p_y1_z0 == 0) | (p_y1_z1 == 0), 0.0, score)
+
+
+def _equal_opportunity_from_cells(cells):
+    n_z0_y1, n_z1_y1 = cells[..., 1, :].sum(axis=-1).T
+    n_pos_z0_y1, n_pos_z1_y1 = cells[..., 1, 1].T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_y1_z0, p_y1_z1 = n_pos_z0_y1 / n_z0_y1, n_pos_z1_y1 / n_z1_y1
+        score = np.minimum(p_y1_z1 / p_y1_z0, p_y1_z0 / p_y1_z1)
+    score = np.where(np.isnan(score), 1.0, score)
+    return np.where((n_z0_y1 == 0) | (n_z1_y1 == 0), 0.0, score)
+
+
+def bootstrap_fairness_score(metric, sensitive_column, estimator, X, y_true=None, positive_target=1,
+                             n_bootstrap=1000, confidence=0.95, method="multinomial",
+                             chunk_size=1000, random_state=None):
+    """
+    Estimates a percentile bootstrap confidence interval for `p_percent_score` or `equal_opportunity_score`.
+
+    Both scores only depend on how many samples fall in each combination of the sensitive attribute,
+    the true target and the predicted target. `estimator.predict` is therefore called once and every
+    bootstrap replicate is drawn as a vector of weights over these counts, which evaluates all
+    replicates in a single vectorized pass regardless of the number of samples.
+
+    :param metric: either `p_percent_score` or `equal_opportunity_score`
+    :param sensitive_column:
+        Name of the column containing the binary sensitive attribute (when X is a dataframe)
+        or the index of the column (when X is a numpy array).
+    :param estimator: a fitted estimator
+    :param X: the data going *in* to your pipeline
+    :param y_true: the true targets, required for `equal_opportunity_score`
+    :param positive_target: The name of the class which is associated with a positive outcome
+    :param n_bootstrap: the number of bootstrap replicates
+    :param confidence: the confidence level of the interval
+    :param method: 'multinomial' resamples exactly n samples with replacement, 'poisson' draws
+        independent Poisson(1) weights per sample (the Poisson bootstrap)
+    :param chunk_size: the number of replicates that are drawn at once, to bound memory
+    :param random_state: seed or `np.random.RandomState` used to draw the replicates
+    :return: a tuple (score, lower, upper)
+    """
+    from_cells = {
+        p_percent_score: _p_percent_from_cells,
+        equal_opportunity_score: _equal_opportunity_from_cells,
+    }.get(metric)
+    if from_cells is None:
+        raise ValueError("metric should be either p_percent_score or equal_opportunity_score")
+    if metric is equal_opportunity_score and y_true is None:
+        raise ValueError("equal_opportunity_score needs y_true")
+    if method not in ["multinomial", "poisson"]:
+        raise ValueError(f"method should be either 'multinomial' or 'poisson', got {method}")
+
+    sensitive_col = X[:, sensitive_column] if isinstance(X, np.ndarray) else X[sensitive_column]
+    cells = _cell_counts(sensitive_col, estimator.predict(X), y_true, positive_target)
+    score = from_cells(cells[np.newaxis])[0]
+
+    rng = check_random_state(random_state)
+    n_obs, flat_cells = cells.sum(), cells.ravel()
+    replicates = []
+    for start in range(0, n_bootstrap, chunk_size):
+        size = min(chunk_size, n_bootstrap - start)
+        if method == "multinomial":
+            weights = rng.multinomial(n_obs, flat_cells / n_obs, size=size)
+        else:
+            # a sum of Poisson(1) weights over the samples in a cell is Poisson(count) distributed
+            weights = rng.poisson(flat_cells, size=(size, len(flat_cells)))
+        replicates.append(from_cells(weights.reshape(size, 2, 2, 2)))
+
+    lower, upper = np.quantile(np.concatenate(replicates), [(1 - confidence) / 2, (1 + confidence) / 2])
+    return score, lower, upper
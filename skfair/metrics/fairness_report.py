@@ -1,22 +1,56 @@
 from functools import partial
 from collections import defaultdict
 
-
+import numpy as np
 from sklearn.metrics import (f1_score, precision_score,
                              accuracy_score, recall_score)
 from terminaltables import AsciiTable
 import pandas as pd
 
 from skfair.metrics import false_discovery_score, false_positive_score
+from skfair.metrics.utils import _factorize_groups, counts_metric, group_confusion_matrices
+
+
+def _micro_counts(conf_matrix, labels):
+    if labels is None:
+        labels = np.arange(conf_matrix.shape[0])
+    tp = conf_matrix.diagonal()[labels].sum()
+    true_sum = conf_matrix.sum(axis=1)[labels].sum()
+    pred_sum = conf_matrix.sum(axis=0)[labels].sum()
+    return tp, true_sum, pred_sum
+
+
+def _micro_recall_from_confusion_matrix(conf_matrix, labels=None):
+    tp, true_sum, _ = _micro_counts(conf_matrix, labels)
+    return tp / true_sum if true_sum else 0.0
+
+
+def _micro_precision_from_confusion_matrix(conf_matrix, labels=None):
+    tp, _, pred_sum = _micro_counts(conf_matrix, labels)
+    return tp / pred_sum if pred_sum else 0.0
+
+
+def _micro_f1_from_confusion_matrix(conf_matrix, labels=None):
+    tp, true_sum, pred_sum = _micro_counts(conf_matrix, labels)
+    return 2 * tp / (true_sum + pred_sum) if true_sum + pred_sum else 0.0
+
+
+def _accuracy_from_confusion_matrix(conf_matrix, labels=None):
+    # accuracy does not depend on the labels, every sample of the group counts
+    return conf_matrix.trace() / conf_matrix.sum()
+
+
+def _accuracy_score(y_true, y_pred, labels=None):
+    return accuracy_score(y_true, y_pred)
 
 
 DEFAULT_METRICS = {
-    "TPR": partial(recall_score, average="micro"),
+    "TPR": counts_metric(_micro_recall_from_confusion_matrix)(partial(recall_score, average="micro")),
     "FPR": false_positive_score,
-    "PPVR": partial(precision_score, average="micro"),
+    "PPVR": counts_metric(_micro_precision_from_confusion_matrix)(partial(precision_score, average="micro")),
     "FDR": false_discovery_score,
-    "ACC": accuracy_score,
-    "F1": partial(f1_score, average="micro")
+    "ACC": counts_metric(_accuracy_from_confusion_matrix)(_accuracy_score),
+    "F1": counts_metric(_micro_f1_from_confusion_matrix)(partial(f1_score, average="micro"))
 }
 
 
@@ -31,6 +65,12 @@ def _yield_metrics(metrics):
         raise ValueError("metrics should be either a list or a dict")
 
 
+def _split_by_group(values, group_codes, n_groups):
+    order = np.argsort(group_codes, kind="stable")
+    boundaries = np.cumsum(np.bincount(group_codes, minlength=n_groups))[:-1]
+    return np.split(np.asarray(values)[order], boundaries)
+
+
 def create_table_report(report_dict):
     headers = [v.keys() for k, v in report_dict.items()][0]
     table_data = [[""] + list(headers)]
@@ -40,24 +80,48 @@ def create_table_report(report_dict):
     return table.table
 
 
-def classification_fairness_report(y_true, y_pred, groups, group_names=None,
-                                   labels=None, output="text",
-                                   metrics=DEFAULT_METRICS):
-    grouped_data = defaultdict(list)
-    for i, (y_t, y_p) in enumerate(zip(y_true, y_pred)):
-        group_key = group_names[i] if group_names else groups[i]
-        grouped_data[group_key].append((y_t, y_p))
+def _report_dict(group_values, classes, conf_matrices, labels, metrics, grouped_data=None):
+    label_idx = None if labels is None else np.searchsorted(classes, labels)
 
     report_dict = defaultdict(dict)
-    for group_name, group_data in grouped_data.items():
-        y_true_group, y_pred_group = zip(*group_data)
+    for i, group_name in enumerate(group_values):
+        conf_matrix = conf_matrices[i]
+        if labels is None:
+            # like sklearn, only consider the labels that occur within the group
+            present = conf_matrix.sum(axis=0) + conf_matrix.sum(axis=1) > 0
+            conf_matrix = conf_matrix[np.ix_(present, present)]
 
         for metric_name, metric in _yield_metrics(metrics):
-            report_dict[group_name][metric_name] = metric(y_true_group, y_pred_group, labels)
-        report_dict[group_name]["Support"] = len(group_data)
+            if hasattr(metric, "from_confusion_matrix"):
+                score = metric.from_confusion_matrix(conf_matrix, label_idx)
+            else:
+                y_true_group, y_pred_group = grouped_data[i]
+                score = metric(y_true_group, y_pred_group, labels)
+            report_dict[group_name][metric_name] = score
+        report_dict[group_name]["Support"] = conf_matrix.sum()
+    return report_dict
+
 
+def _format_report(report_dict, output):
     if output == "dict":
         return report_dict
     if output == "pandas":
         return pd.DataFrame(report_dict)
     return create_table_report(report_dict)
+
+
+def classification_fairness_report(y_true, y_pred, groups, group_names=None,
+                                   labels=None, output="text",
+                                   metrics=DEFAULT_METRICS):
+    group_keys = group_names if group_names is not None else groups
+    group_values, classes, conf_matrices = group_confusion_matrices(y_true, y_pred, group_keys, labels)
+
+    grouped_data = None
+    if not all(hasattr(metric, "from_confusion_matrix") for _, metric in _yield_metrics(metrics)):
+        # metrics we do not know how to derive from counts get the raw data of every group
+        group_codes = _factorize_groups(group_keys)[0]
+        grouped_data = list(zip(_split_by_group(y_true, group_codes, len(group_values)),
+                                _split_by_group(y_pred, group_codes, len(group_values))))
+
+    report_dict = _report_dict(group_values, classes, conf_matrices, labels, metrics, grouped_data)
+    return _format_report(report_dict, output)
@@ -0,0 +1,60 @@
+from sklearn.metrics import check_scoring
+
+from skfair.common import as_list
+from skfair.metrics.equal_opportunity_score import equal_opportunity_score
+from skfair.metrics.p_percent_score import p_percent_score
+
+
+class _PredictionCache:
+    """Wraps an estimator such that `predict` runs at most once for the same X."""
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+        self._X = None
+        self._y_hat = None
+
+    def predict(self, X):
+        if X is not self._X:
+            self._X, self._y_hat = X, self.estimator.predict(X)
+        return self._y_hat
+
+    def __getattr__(self, item):
+        return getattr(self.estimator, item)
+
+
+def make_fairness_scorer(sensitive_columns, metrics=(p_percent_score, equal_opportunity_score),
+                         positive_target=1, scoring=None):
+    """
+    Combines fairness metrics over several sensitive columns into a single multi-metric scorer
+    that only calls `estimator.predict` once per (estimator, X) pair. It can be passed directly
+    as `scoring=` to scikit-learn's model selection tools like `GridSearchCV`.
+
+    :Example:
+
+    >>> scorer = make_fairness_scorer(["x1", "x2"], scoring={"accuracy": "accuracy"})  # doctest: +SKIP
+    >>> GridSearchCV(clf, param_grid, scoring=scorer, refit="accuracy")  # doctest: +SKIP
+
+    :param sensitive_columns:
+        Names of the columns containing binary sensitive attributes (when X is a dataframe)
+        or the indices of the columns (when X is a numpy array).
+    :param metrics: fairness metric factories (sensitive_column, positive_target) -> scorer,
+        every metric is evaluated for every sensitive column.
+    :param positive_target: The name of the class which is associated with a positive outcome
+    :param scoring: dict of additional scorers (name -> scorer name or callable (clf, X, y_true) -> float)
+        that are evaluated on the same predictions
+    :return: a function (clf, X, y_true) -> dict that maps `<metric>_<column>` and the names in `scoring` to scores
+    """
+    scorers = {
+        f"{metric.__name__}_{column}": metric(column, positive_target=positive_target)
+        for metric in as_list(metrics)
+        for column in as_list(sensitive_columns)
+    }
+
+    def impl(estimator, X, y_true=None):
+        predictor = _PredictionCache(estimator)
+        scores = {name: scorer(predictor, X, y_true) for name, scorer in scorers.items()}
+        for name, scorer in (scoring or {}).items():
+            scores[name] = check_scoring(estimator, scoring=scorer)(predictor, X, y_true)
+        return scores
+
+    return impl
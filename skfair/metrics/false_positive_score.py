@@ -1,8 +1,15 @@
 from sklearn.metrics import confusion_matrix
 
-from skfair.metrics.utils import true_false_positive_negative
+from skfair.metrics.utils import counts_metric, select_labels, true_false_positive_negative
 
 
+def _false_positive_from_confusion_matrix(conf_matrix, labels=None):
+    tn, fp, fn, tp = true_false_positive_negative(select_labels(conf_matrix, labels))
+    eps = 1e-10
+    return fp / (fp + tn + eps)
+
+
+@counts_metric(_false_positive_from_confusion_matrix)
 def false_positive_score(y_true, y_pred, labels=None):
     """
     Args:
@@ -22,6 +29,4 @@ def false_positive_score(y_true, y_pred, labels=None):
     False positive rate then equals to FP / (TN + FP)
     """
     conf_matrix = confusion_matrix(y_true, y_pred, labels=labels)
-    tn, fp, fn, tp = true_false_positive_negative(conf_matrix)
-    eps = 1e-10
-    return fp / (fp + tn + eps)
+    return _false_positive_from_confusion_matrix(conf_matrix)
@@ -0,0 +1,261 @@
+import copy
+from itertools import repeat
+
+import numpy as np
+
+from skfair.metrics.equal_opportunity_score import _equal_opportunity_from_counts
+from skfair.metrics.fairness_report import DEFAULT_METRICS, _format_report, _report_dict, _yield_metrics
+from skfair.metrics.false_discovery_score import false_discovery_score
+from skfair.metrics.false_positive_score import false_positive_score
+from skfair.metrics.p_percent_score import _p_percent_from_counts
+from skfair.metrics.utils import group_confusion_matrices
+
+
+def _group_key(group):
+    """Missing groups (None or NaN) of different chunks are all the same group."""
+    if group is None or (isinstance(group, float) and np.isnan(group)):
+        return None
+    return group
+
+
+class GroupConfusionCounts:
+    """
+    The confusion matrix of every group, accumulated over chunks of data. These counts are
+    sufficient statistics for all metrics in `skfair.metrics`, so memory only depends on the
+    number of groups and classes and not on the number of samples.
+
+    :param labels: labels that should be part of the class axis even if they are not observed
+
+    :Example:
+
+    >>> counts = GroupConfusionCounts()
+    >>> counts = counts.update([0, 1, 1], [0, 1, 0], ["a", "a", "b"]).update([1], [1], ["c"])
+    >>> counts.groups_
+    ['a', 'b', 'c']
+    >>> counts.counts_[0]
+    array([[1, 0],
+           [0, 1]])
+    """
+
+    def __init__(self, labels=None):
+        self.labels = labels
+        self.groups_ = []
+        self.classes_ = None
+        self.counts_ = None
+
+    def update(self, y_true, y_pred, groups):
+        """Adds the confusion matrices of a chunk of data to the counts."""
+        return self._add(*group_confusion_matrices(y_true, y_pred, groups, self.labels))
+
+    def merge(self, other):
+        """Adds the counts of another `GroupConfusionCounts`, e.g. one that was computed on another worker."""
+        if other.counts_ is None:
+            return self
+        return self._add(other.groups_, other.classes_, other.counts_)
+
+    def _add(self, groups, classes, counts):
+        if self.counts_ is None:
+            self.groups_, self.classes_, self.counts_ = list(groups), np.asarray(classes), counts.astype(np.int64)
+            return self
+
+        all_classes = np.union1d(self.classes_, classes)
+        group_idx = {_group_key(group): i for i, group in enumerate(self.groups_)}
+        for group in groups:
+            if _group_key(group) not in group_idx:
+                group_idx[_group_key(group)] = len(self.groups_)
+                self.groups_.append(group)
+
+        new_counts = np.zeros((len(self.groups_), len(all_classes), len(all_classes)), dtype=np.int64)
+        old_idx = np.searchsorted(all_classes, self.classes_)
+        new_counts[np.ix_(np.arange(len(self.counts_)), old_idx, old_idx)] = self.counts_
+        idx = np.searchsorted(all_classes, classes)
+        new_counts[np.ix_([group_idx[_group_key(group)] for group in groups], idx, idx)] += counts
+
+        self.classes_, self.counts_ = all_classes, new_counts
+        return self
+
+
+class _FairnessAccumulator:
+    def __init__(self, labels=None):
+        self.counts_ = GroupConfusionCounts(labels=labels)
+
+    def update(self, y_true, y_pred, groups):
+        """Adds a chunk of data to the accumulated counts."""
+        self.counts_.update(y_true, y_pred, groups)
+        return self
+
+    def merge(self, other):
+        """Adds the counts accumulated by another accumulator of the same kind."""
+        if type(other) is not type(self):
+            raise TypeError(f"can not merge {type(other).__name__} into {type(self).__name__}")
+        self.counts_.merge(other.counts_)
+        return self
+
+    def result(self):
+        raise NotImplementedError("subclasses of _FairnessAccumulator should implement result")
+
+    def _check_accumulated(self):
+        if self.counts_.counts_ is None:
+            raise ValueError(f"{type(self).__name__} has not seen any data, call `update` first")
+
+
+class _BinarySensitiveAccumulator(_FairnessAccumulator):
+    def __init__(self, positive_target=1, sensitive_column="z"):
+        super().__init__(labels=[positive_target])
+        self.positive_target = positive_target
+        self.sensitive_column = sensitive_column
+
+    def _sensitive_counts(self):
+        """Returns the confusion matrices for z = 0 and z = 1 and the index of the positive target."""
+        self._check_accumulated()
+        counts = self.counts_
+        if not set(counts.groups_) <= {0, 1}:
+            raise ValueError(
+                f"{type(self).__name__} only supports binary indicators as groups. Found values {counts.groups_}"
+            )
+        conf_matrices = np.zeros((2,) + counts.counts_.shape[1:], dtype=np.int64)
+        for group, conf_matrix in zip(counts.groups_, counts.counts_):
+            conf_matrices[int(group)] = conf_matrix
+        return conf_matrices, np.searchsorted(counts.classes_, self.positive_target)
+
+
+class PPercentAccumulator(_BinarySensitiveAccumulator):
+    """
+    Computes the `p_percent_score` over chunks of predictions, e.g. when they do not fit in memory.
+
+    :param positive_target: The name of the class which is associated with a positive outcome
+    :param sensitive_column: Name of the sensitive attribute, only used in warnings
+
+    :Example:
+
+    >>> acc = PPercentAccumulator()
+    >>> for y_pred, z in [([1, 0, 1], [1, 1, 0]), ([0, 1, 0], [0, 0, 1])]:
+    ...     acc = acc.update(None, y_pred, z)
+    >>> acc.result()
+    0.5
+    """
+
+    def update(self, y_true, y_pred, groups):
+        """Adds a chunk of predictions, `y_true` is not needed and can be None."""
+        return super().update(y_pred if y_true is None else y_true, y_pred, groups)
+
+    def result(self):
+        conf_matrices, pos = self._sensitive_counts()
+        n_z0, n_z1 = conf_matrices.sum(axis=(1, 2))
+        n_pos_z0, n_pos_z1 = conf_matrices[:, :, pos].sum(axis=1)
+        return _p_percent_from_counts(n_z0, n_z1, n_pos_z0, n_pos_z1, self.sensitive_column, self.positive_target)
+
+
+class EqualOpportunityAccumulator(_BinarySensitiveAccumulator):
+    """
+    Computes the `equal_opportunity_score` over chunks of predictions, e.g. when they do not fit in memory.
+
+    :param positive_target: The name of the class which is associated with a positive outcome
+    :param sensitive_column: Name of the sensitive attribute, only used in warnings
+    """
+
+    def result(self):
+        conf_matrices, pos = self._sensitive_counts()
+        n_z0_y1, n_z1_y1 = conf_matrices[:, pos, :].sum(axis=1)
+        n_pos_z0_y1, n_pos_z1_y1 = conf_matrices[:, pos, pos]
+        return _equal_opportunity_from_counts(
+            n_z0_y1, n_z1_y1, n_pos_z0_y1, n_pos_z1_y1, self.sensitive_column, self.positive_target
+        )
+
+
+class _ConfusionMatrixAccumulator(_FairnessAccumulator):
+    metric = None
+
+    def __init__(self, labels=None):
+        super().__init__(labels=labels)
+        self.labels = labels
+
+    def update(self, y_true, y_pred, groups=None):
+        """Adds a chunk of data, the groups are not needed for this metric."""
+        return super().update(y_true, y_pred, np.zeros(len(y_true), dtype=int) if groups is None else groups)
+
+    def result(self):
+        self._check_accumulated()
+        counts = self.counts_
+        label_idx = None if self.labels is None else np.searchsorted(counts.classes_, self.labels)
+        return self.metric.from_confusion_matrix(counts.counts_.sum(axis=0), label_idx)
+
+
+class FalsePositiveAccumulator(_ConfusionMatrixAccumulator):
+    """
+    Computes the `false_positive_score` over chunks of data, e.g. when they do not fit in memory.
+
+    :param labels: labels to be included in the calculation of the score
+    """
+
+    metric = staticmethod(false_positive_score)
+
+
+class FalseDiscoveryAccumulator(_ConfusionMatrixAccumulator):
+    """
+    Computes the `false_discovery_score` over chunks of data, e.g. when they do not fit in memory.
+
+    :param labels: labels to be included in the calculation of the score
+    """
+
+    metric = staticmethod(false_discovery_score)
+
+
+class FairnessReportAccumulator(_FairnessAccumulator):
+    """
+    Computes the `classification_fairness_report` over chunks of data, e.g. when they do not fit in memory.
+
+    :param labels: labels to be included in the calculation of the metrics
+    :param metrics: metrics to report, all of them need to support `from_confusion_matrix`
+        (see `skfair.metrics.utils.counts_metric`) because the raw data is not kept around
+    """
+
+    def __init__(self, labels=None, metrics=DEFAULT_METRICS):
+        missing = [name for name, metric in _yield_metrics(metrics) if not hasattr(metric, "from_confusion_matrix")]
+        if missing:
+            raise ValueError(f"metrics {missing} can not be computed from confusion matrices")
+        super().__init__(labels=labels)
+        self.labels = labels
+        self.metrics = metrics
+
+    def result(self, output="text"):
+        self._check_accumulated()
+        counts = self.counts_
+        report_dict = _report_dict(counts.groups_, counts.classes_, counts.counts_, self.labels, self.metrics)
+        return _format_report(report_dict, output)
+
+
+def _accumulate_shard(accumulator, shard):
+    if callable(shard):
+        shard = shard()
+    return copy.deepcopy(accumulator).update(*shard)
+
+
+def evaluate_sharded(accumulator, shards, executor=None, **result_kwargs):
+    """
+    Computes a metric over a sharded dataset. Every shard is accumulated separately, possibly
+    in another process or on another machine, and the partial counts are merged in the order
+    of the shards. Because only integer counts are merged, the result is identical to the
+    result on the concatenated data.
+
+    :param accumulator: an accumulator without data that defines the metric, e.g. `PPercentAccumulator()`
+    :param shards: iterable of `(y_true, y_pred, groups)` tuples, or of functions without arguments
+        that return such a tuple so that the data of a shard is only loaded by the worker
+    :param executor: a `concurrent.futures.Executor` used to map over the shards,
+        the shards are processed sequentially when None
+    :param result_kwargs: keyword arguments for the `result` method of the accumulator
+    :return: the result of the merged accumulator
+
+    :Example:
+
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> shards = [([1, 1, 0], [1, 0, 0], [1, 1, 0]), ([1, 1], [1, 1], [0, 0])]
+    >>> with ThreadPoolExecutor(2) as executor:
+    ...     evaluate_sharded(EqualOpportunityAccumulator(), shards, executor=executor)
+    0.5
+    """
+    mapper = map if executor is None else executor.map
+    merged = copy.deepcopy(accumulator)
+    for partial in mapper(_accumulate_shard, repeat(accumulator), shards):
+        merged.merge(partial)
+    return merged.result(**result_kwargs)
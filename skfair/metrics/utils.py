@@ -1,3 +1,138 @@
+import numpy as np
+import pandas as pd
+
+
+def counts_metric(from_confusion_matrix):
+    """
+    Declares that a metric can also be computed from a precomputed confusion matrix.
+
+    The decorated metric keeps its ``(y_true, y_pred, labels=None)`` signature and gets a
+    ``from_confusion_matrix(conf_matrix, labels=None)`` attribute. There ``conf_matrix`` has the
+    true classes on the rows and the predicted classes on the columns and ``labels`` holds the
+    indices of the classes to include (None means all of them). Reports that already counted
+    the confusion matrix of a group use this to skip recounting the labels for every metric.
+
+    Args:
+       from_confusion_matrix: function (conf_matrix, labels) -> float
+    Returns:
+       a decorator that attaches ``from_confusion_matrix`` to a metric
+
+    :Example:
+
+    >>> from functools import partial
+    >>> from sklearn.metrics import recall_score
+    >>> micro_recall = counts_metric(lambda cm, labels=None: cm.trace() / cm.sum())(
+    ...     partial(recall_score, average="micro"))
+    >>> micro_recall.from_confusion_matrix(np.array([[2, 1], [0, 1]]))
+    0.75
+    """
+
+    def decorate(metric):
+        metric.from_confusion_matrix = from_confusion_matrix
+        return metric
+
+    return decorate
+
+
+def select_labels(conf_matrix, labels=None):
+    """
+    Restricts a confusion matrix to the rows and columns of the given label indices.
+
+    Args:
+       conf_matrix: 2d array-like, the confusion matrix
+       labels: indices of the labels to keep, None keeps the matrix as is
+    Returns:
+       the confusion matrix of the selected labels
+    """
+    if labels is None:
+        return conf_matrix
+    return conf_matrix[np.ix_(labels, labels)]
+
+
+def _factorize_groups(groups):
+    """
+    Encodes the groups as integer codes, like `pd.factorize` but missing values (None or NaN)
+    form a group of their own instead of getting the code -1.
+
+    Args:
+       groups: 1d array-like, the group every sample belongs to
+    Returns:
+       codes, uniques: the code of every sample and the unique groups in order of first appearance
+    """
+    if not hasattr(groups, "dtype"):
+        # as objects, such that keys of mixed types are not all converted to strings
+        groups = np.asarray(groups, dtype=object)
+    try:
+        return pd.factorize(groups, use_na_sentinel=False)
+    except TypeError:
+        # pandas < 1.5
+        return pd.factorize(groups, na_sentinel=None)
+
+
+def group_confusion_matrices(y_true, y_pred, groups, labels=None):
+    """
+    Computes the confusion matrix of every group in a single pass over the data.
+
+    Args:
+       y_true: 1d array-like, ground truth of target labels
+       y_pred: 1d array-like, predictions of target labels
+       groups: 1d array-like, the group every sample belongs to
+       labels: labels that should be part of the class axis even if they are not observed
+    Returns:
+       groups, classes, conf_matrices: the unique groups in order of first appearance, the
+       sorted classes and an array of shape (n_groups, n_classes, n_classes) with the true
+       classes on the rows and the predicted classes on the columns
+    """
+    y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+    group_codes, group_values = _factorize_groups(groups)
+    observed = [y_true, y_pred] if labels is None else [y_true, y_pred, np.asarray(labels)]
+    classes, class_codes = np.unique(np.concatenate(observed), return_inverse=True)
+    true_codes, pred_codes = class_codes[:len(y_true)], class_codes[len(y_true):2 * len(y_true)]
+
+    n_groups, n_classes = len(group_values), len(classes)
+    flat_idx = (group_codes * n_classes + true_codes) * n_classes + pred_codes
+    conf_matrices = np.bincount(flat_idx, minlength=n_groups * n_classes * n_classes)
+    return group_values, classes, conf_matrices.reshape(n_groups, n_classes, n_classes)
+
+
+def binary_group_counts(sensitive_col, y_hat, positive_target=1, where=None, validate=True):
+    """
+    Counts the samples and the positive predictions in both groups of a binary sensitive attribute
+    without copying the predictions of every group. Only boolean indicators are allocated, which are
+    combined in place.
+
+    Args:
+       sensitive_col: 1d array-like, binary indicator of the sensitive attribute
+       y_hat: 1d array-like, predictions of target labels
+       positive_target: the class which is associated with a positive outcome
+       where: optional 1d boolean array, only samples where this is True are counted
+       validate: check that `sensitive_col` only contains zeros and ones, when False
+           every value other than one is counted as zero
+    Returns:
+       n_z0, n_z1, n_pos_z0, n_pos_z1: the number of samples and the number of positive
+       predictions for z = 0 and z = 1
+    Raises:
+       ValueError: when `validate` is True and `sensitive_col` contains other values than 0 and 1
+    """
+    sensitive_col = np.asarray(sensitive_col)
+    z1 = sensitive_col == 1
+    if validate and np.count_nonzero(z1) + np.count_nonzero(sensitive_col == 0) != len(sensitive_col):
+        raise ValueError(f"Found values {np.unique(sensitive_col)}")
+
+    positive = np.asarray(y_hat) == positive_target
+    if where is not None:
+        np.logical_and(z1, where, out=z1)
+        np.logical_and(positive, where, out=positive)
+        n_obs = np.count_nonzero(where)
+    else:
+        n_obs = len(sensitive_col)
+
+    n_z1 = np.count_nonzero(z1)
+    n_pos = np.count_nonzero(positive)
+    n_pos_z1 = np.count_nonzero(np.logical_and(positive, z1, out=z1))
+    return n_obs - n_z1, n_z1, n_pos - n_pos_z1, n_pos_z1
+
+
 def true_false_positive_negative(conf_matrix):
     """
     Get global true positive, false positive, true negative, false negative
@@ -14,18 +149,37 @@ def true_false_positive_negative(conf_matrix):
     FN: the sum of the row of true class minus TP
     TN: sum of the matrix minus TP+FP+FN
     """
-    if conf_matrix.shape == (2, 2):  # binary case
-        tn, fp, fn, tp = conf_matrix.ravel()
-        return tn, fp, fn, tp
-    tp = 0
-    fp = 0
-    fn = 0
-    tn = 0
-    # A second check on the below is appreciated.
-    for i in range(conf_matrix.shape[0]):
-        tp += conf_matrix[i, i]
-        fn += conf_matrix[i, :].sum() - conf_matrix[i, i]
-        fp += conf_matrix[:, i].sum() - conf_matrix[i, i]
-        tn += (conf_matrix[:i, :i].sum() + conf_matrix[:i, i+1:].sum() +
-               conf_matrix[i+1:, :i].sum() + conf_matrix[i+1:, i+1:].sum())
+    tn, fp, fn, tp = batch_true_false_positive_negative(np.asarray(conf_matrix)[np.newaxis])
+    return tn[0], fp[0], fn[0], tp[0]
+
+
+def batch_true_false_positive_negative(conf_matrices):
+    """
+    Get global true positive, false positive, true negative, false negative
+    for a stack of confusion matrices, e.g. one per group, in one call
+
+    Args:
+       conf_matrices: 3d array-like of shape (n_matrices, n_classes, n_classes)
+    Returns:
+       TN, FP, FN, TP: 1d arrays of length n_matrices
+    For a binary (2 x 2) confusion matrix these are the counts of the second class.
+    Otherwise they are summed over all classes, which only needs the diagonal,
+    the row sums and the column sums of every matrix:
+    TP: sum of the diagonal
+    FP: sum over the classes of the column sum minus the diagonal element
+    FN: sum over the classes of the row sum minus the diagonal element
+    TN: sum over the classes of the total minus the row and column sum plus the diagonal element
+    """
+    conf_matrices = np.asarray(conf_matrices)
+    if conf_matrices.shape[1:] == (2, 2):  # binary case
+        return (conf_matrices[:, 0, 0], conf_matrices[:, 0, 1],
+                conf_matrices[:, 1, 0], conf_matrices[:, 1, 1])
+    diagonal = np.diagonal(conf_matrices, axis1=1, axis2=2)
+    row_sums = conf_matrices.sum(axis=2)
+    col_sums = conf_matrices.sum(axis=1)
+    total = row_sums.sum(axis=1)
+    tp = diagonal.sum(axis=1)
+    fp = col_sums.sum(axis=1) - tp
+    fn = total - tp
+    tn = conf_matrices.shape[1] * total - row_sums.sum(axis=1) - col_sums.sum(axis=1) + tp
     return tn, fp, fn, tp
@@ -1,20 +1,14 @@
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from sklearn.base import BaseEstimator, TransformerMixin
-from sklearn.utils import check_array
+from sklearn.utils import check_array, gen_batches, get_chunk_n_rows
+from sklearn.utils.extmath import safe_sparse_dot
 from sklearn.utils.validation import check_is_fitted
 
 from skfair.common import as_list
 
 
-def _scalar_projection(vec, unto):
-    return vec.dot(unto) / unto.dot(unto)
-
-
-def _vector_projection(vec, unto):
-    return _scalar_projection(vec, unto) * unto
-
-
 class InformationFilter(BaseEstimator, TransformerMixin):
     """
     The `InformationFilter` uses a variant of the gram smidt process
@@ -42,74 +36,188 @@ class InformationFilter(BaseEstimator, TransformerMixin):
                     (in the case of numpy) or string (in the case of pandas).
     :param alpha: parameter to control how much to filter, for alpha=1 we filter out
                   all information while for alpha=0 we don't apply any.
+
+    Scipy sparse input is supported as long as the sensitive columns fit in memory as a dense
+    (n_samples, n_sensitive_columns) array. Filtering adds a dense low rank correction to the
+    other columns, so the output is dense unless alpha=0 or there are no sensitive columns,
+    in which case the sparse input without the sensitive columns is returned.
     """
 
     def __init__(self, columns, alpha=1):
         self.columns = columns
         self.alpha = alpha
 
-    def _check_coltype(self, X):
-        check_array(X, estimator=self)
+    def _check_coltype(self, X, n_features):
         for col in as_list(self.columns):
             if isinstance(col, str):
-                if isinstance(X, np.ndarray):
+                if not isinstance(X, pd.DataFrame):
                     raise ValueError(
-                        f"column {col} is a string but datatype receive is numpy."
+                        f"column {col} is a string but datatype receive is not a dataframe."
                     )
                 if isinstance(X, pd.DataFrame):
                     if col not in X.columns:
                         raise ValueError(f"column {col} is not in {X.columns}")
             if isinstance(col, int):
-                if col not in range(np.atleast_2d(np.array(X)).shape[1]):
+                if col not in range(n_features):
                     raise ValueError(
                         f"column {col} is out of bounds for input shape {X.shape}"
                     )
 
     def _col_idx(self, X, name):
         if isinstance(name, str):
-            if isinstance(X, np.ndarray):
+            if not isinstance(X, pd.DataFrame):
                 raise ValueError(
                     "You cannot have a column of type string on a numpy input matrix."
                 )
-            return {name: i for i, name in enumerate(X.columns)}[name]
+            # a hash lookup in the index of the dataframe, the positions are stored in col_ids_ by fit
+            return X.columns.get_loc(name)
         return name
 
     def _make_v_vectors(self, X, col_ids):
-        vs = np.zeros((X.shape[0], len(col_ids)))
-        for i, c in enumerate(col_ids):
-            vs[:, i] = X[:, col_ids[i]]
-            for j in range(0, i):
-                vs[:, i] = vs[:, i] - _vector_projection(vs[:, i], vs[:, j])
-        return vs
-
-    def fit(self, X, y=None):
-        """Learn the projection required to make the dataset orthogonal to sensitive columns."""
-        self._check_coltype(X)
-        self.col_ids_ = [
+        # the vectors of the gram smidt process are the columns of Q scaled by the diagonal of R
+        q, r = np.linalg.qr(np.asarray(X[:, col_ids], dtype=np.float64))
+        return q * np.diag(r)
+
+    def _sensitive_columns(self, X, col_ids):
+        """The sensitive columns of X as a dense array, also when X is sparse."""
+        sensitive = X[:, col_ids]
+        return sensitive.toarray() if sp.issparse(sensitive) else sensitive
+
+    def _validate_columns(self, X):
+        X_array = check_array(
+            X, estimator=self, accept_sparse=["csr", "csc"], dtype=[np.float64, np.float32]
+        )
+        self._check_coltype(X, X_array.shape[1])
+        col_ids = [
             v if isinstance(v, int) else self._col_idx(X, v)
             for v in as_list(self.columns)
         ]
-        X = check_array(X, estimator=self)
-        X_fair = X.copy()
-        v_vectors = self._make_v_vectors(X, self.col_ids_)
-        # gram smidt process but only on sensitive attributes
-        for i, col in enumerate(X_fair.T):
-            for v in v_vectors.T:
-                X_fair[:, i] = X_fair[:, i] - _vector_projection(X_fair[:, i], v)
-        # we want to learn matrix P: X P = X_fair
-        # this means we first need to create X_fair in order to learn P
-        self.projection_, resid, rank, s = np.linalg.lstsq(X, X_fair, rcond=None)
+        return X_array, col_ids
+
+    def fit(self, X, y=None):
+        """Learn the projection required to make the dataset orthogonal to sensitive columns."""
+        X, self.col_ids_ = self._validate_columns(X)
+        # with a thin QR decomposition S = QR of the sensitive columns, gram smidt gives
+        # X_fair = (I - Q Q^T) X = X - S R^-1 Q^T X, so the projection P with X P = X_fair
+        # is the identity minus R^-1 Q^T X in the rows of the sensitive columns
+        coef = np.zeros((0, X.shape[1]))
+        self._cross_products = np.zeros((0, X.shape[1]))
+        if self.col_ids_:
+            q, r = np.linalg.qr(np.asarray(self._sensitive_columns(X, self.col_ids_), dtype=np.float64))
+            q_X = np.asarray(safe_sparse_dot(q.T.astype(X.dtype), X, dense_output=True), dtype=np.float64)
+            coef, resid, rank, s = np.linalg.lstsq(r, q_X, rcond=None)
+            # S^T X = R^T Q^T X, such that partial_fit and merge can continue from here
+            self._cross_products = r.T @ q_X
+        self._n_samples_seen = X.shape[0]
+        self._set_projection(coef)
+        return self
+
+    def partial_fit(self, X, y=None):
+        """
+        Learn the projection incrementally from a chunk of the data, e.g. when the dataset does not fit
+        in memory. The projection only depends on the cross products S^T X of the sensitive columns S
+        with all columns, which add up over chunks, so after seeing all chunks the projection is the
+        same as the one of `fit` on all data. Besides the cross products of the chunk, every call only
+        solves the (k, n_features) coefficients `coef_`, no dense projection matrix is built.
+
+        :param X: a chunk of the data, including the sensitive columns
+        :param y: ignored
+        :return: self
+        """
+        X, col_ids = self._validate_columns(X)
+        if not hasattr(self, "_cross_products"):
+            self.col_ids_ = col_ids
+            self._cross_products = np.zeros((len(col_ids), X.shape[1]))
+            self._n_samples_seen = 0
+        self._check_same_columns(X.shape[1], col_ids)
+        sensitive = self._sensitive_columns(X, col_ids)
+        self._cross_products += np.asarray(safe_sparse_dot(sensitive.T, X, dense_output=True), dtype=np.float64)
+        self._n_samples_seen += X.shape[0]
+        self._set_projection(self._solve_cross_products())
+        return self
+
+    def merge(self, other):
+        """
+        Adds the data seen by another fitted `InformationFilter` with the same columns, e.g. one that
+        called `partial_fit` on other chunks of the dataset in another worker.
+
+        :param other: a fitted `InformationFilter`
+        :return: self, with the projection learned from the data seen by both filters
+        """
+        check_is_fitted(self, ["coef_", "col_ids_"])
+        check_is_fitted(other, ["coef_", "col_ids_"])
+        self._check_same_columns(other._cross_products.shape[1], other.col_ids_)
+        self._cross_products = self._cross_products + other._cross_products
+        self._n_samples_seen += other._n_samples_seen
+        self._set_projection(self._solve_cross_products())
         return self
 
-    def transform(self, X):
-        """Transforms X by applying the information filter."""
-        check_is_fitted(self, ["projection_", "col_ids_"])
-        self._check_coltype(X)
-        X = check_array(X, estimator=self)
-        # apply the projection and remove the column we won't need
-        X_fair = X @ self.projection_
-        X_removed = np.delete(X_fair, self.col_ids_, axis=1)
-        X_orig = np.delete(X, self.col_ids_, axis=1)
-        return self.alpha * np.atleast_2d(X_removed) + (1 - self.alpha) * np.atleast_2d(
-            X_orig
+    def _check_same_columns(self, n_features, col_ids):
+        if n_features != self._cross_products.shape[1]:
+            raise ValueError(
+                f"X has {n_features} features, but the filter has seen data with {self._cross_products.shape[1]} features"
+            )
+        if list(col_ids) != list(self.col_ids_):
+            raise ValueError(f"the sensitive columns {col_ids} differ from the columns {self.col_ids_} seen before")
+
+    def _solve_cross_products(self):
+        # the least squares coefficients (S^T S)^-1 S^T X, S^T S are the cross products of the sensitive columns
+        coef, resid, rank, s = np.linalg.lstsq(self._cross_products[:, self.col_ids_], self._cross_products, rcond=None)
+        return coef
+
+    def _set_projection(self, coef):
+        # the projection is a rank k correction of the identity, only the k x d factor is stored
+        self.coef_ = coef
+        self.n_features_in_ = coef.shape[1]
+
+    @property
+    def projection_(self):
+        """The dense (n_features, n_features) projection matrix, computed from `coef_` on access."""
+        projection = np.eye(self.n_features_in_)
+        projection[self.col_ids_] -= self.coef_
+        return projection
+
+    def transform(self, X, out=None):
+        """
+        Transforms X by applying the information filter.
+
+        :param X: the data, including the sensitive columns
+        :param out: optional array of shape (n_samples, n_features - n_sensitive_columns) to write the result to
+        :return: the filtered data without the sensitive columns, a sparse matrix for sparse X if
+            nothing is filtered and no `out` is given
+        """
+        check_is_fitted(self, ["coef_", "col_ids_"])
+        X_array = check_array(
+            X, estimator=self, accept_sparse=["csr", "csc"], dtype=[np.float64, np.float32]
         )
+        self._check_coltype(X, X_array.shape[1])
+        X = X_array
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the filter is fitted on {self.n_features_in_} features"
+            )
+        kept = np.delete(np.arange(X.shape[1]), self.col_ids_)
+        filtered = self.alpha and len(self.col_ids_)
+        if sp.issparse(X):
+            if not filtered and out is None:
+                return X[:, kept]
+            X = X.tocsr()
+        if out is None:
+            out = np.empty((X.shape[0], len(kept)), dtype=X.dtype)
+        elif out.shape != (X.shape[0], len(kept)):
+            raise ValueError(f"out should have shape {(X.shape[0], len(kept))}, got {out.shape}")
+        # alpha * X @ P + (1 - alpha) * X without the sensitive columns equals X_kept - alpha * S @ coef_kept,
+        # which costs O(n d k) and is computed in row chunks to bound the temporaries
+        correction = (self.alpha * self.coef_[:, kept]).astype(X.dtype, copy=False)
+        # the temporaries of a chunk are its sensitive columns and the product with the correction
+        row_bytes = max((len(kept) + len(self.col_ids_)) * X.dtype.itemsize, 1)
+        chunk_n_rows = get_chunk_n_rows(row_bytes=row_bytes, max_n_rows=X.shape[0])
+        for batch in gen_batches(X.shape[0], chunk_n_rows):
+            if sp.issparse(X):
+                out[batch] = X[batch][:, kept].toarray()
+            else:
+                # the indices are valid, with mode="clip" np.take writes to out without a temporary copy
+                np.take(X[batch], kept, axis=1, out=out[batch], mode="clip")
+            if filtered:
+                out[batch] -= self._sensitive_columns(X[batch], self.col_ids_) @ correction
+        return out
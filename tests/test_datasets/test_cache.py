@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import skfair.datasets
+from skfair.datasets import _read_csv_cached, _replace_column_cache, load_boston
+
+
+def test_boston_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCIKIT_LEARN_DATA", str(tmp_path))
+    expected = load_boston(give_pandas=True)
+    assert len(os.listdir(tmp_path / "skfair_cache")) == 1
+    pd.testing.assert_frame_equal(load_boston(give_pandas=True), expected)
+    X, y = load_boston(return_X_y=True)
+    np.testing.assert_array_equal(X, expected.drop(columns="price").values)
+
+
+def test_cache_strings_and_missing_values(tmp_path):
+    filepath = str(tmp_path / "data.csv")
+    pd.DataFrame({"a": [1, 2, 3], "b": ["x", None, "y"], "c": [0.5, np.nan, 1.0]}).to_csv(filepath, index=False)
+    expected = pd.read_csv(filepath)
+    _read_csv_cached(filepath, "data", data_home=str(tmp_path))
+    pd.testing.assert_frame_equal(_read_csv_cached(filepath, "data", data_home=str(tmp_path)), expected)
+
+
+def test_cache_invalidated_by_checksum(tmp_path):
+    filepath = str(tmp_path / "data.csv")
+    pd.DataFrame({"a": [1, 2, 3]}).to_csv(filepath, index=False)
+    _read_csv_cached(filepath, "data", data_home=str(tmp_path))
+    pd.DataFrame({"a": [4, 5]}).to_csv(filepath, index=False)
+    pd.testing.assert_frame_equal(_read_csv_cached(filepath, "data", data_home=str(tmp_path)), pd.read_csv(filepath))
+    assert len(os.listdir(tmp_path / "skfair_cache")) == 1
+
+
+def _is_memory_mapped(values):
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = values.base
+    return False
+
+
+def test_cache_memory_maps_numeric_columns(tmp_path):
+    filepath = str(tmp_path / "data.csv")
+    pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": ["x", "y", "x"]}).to_csv(filepath, index=False)
+    _read_csv_cached(filepath, "data", data_home=str(tmp_path))
+    df = _read_csv_cached(filepath, "data", data_home=str(tmp_path))
+    assert _is_memory_mapped(df["a"].values)
+    # the mapping is copy on write, changes do not end up in the cache
+    df["a"] += 1
+    assert _read_csv_cached(filepath, "data", data_home=str(tmp_path))["a"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_cache_keeps_current_folder(tmp_path):
+    filepath = str(tmp_path / "data.csv")
+    pd.DataFrame({"a": [1, 2, 3]}).to_csv(filepath, index=False)
+    expected = _read_csv_cached(filepath, "data", data_home=str(tmp_path))
+    cache_dir, = [str(path) for path in (tmp_path / "skfair_cache").iterdir()]
+    _replace_column_cache(expected, cache_dir, "data")
+    assert os.listdir(tmp_path / "skfair_cache") == [os.path.basename(cache_dir)]
+    pd.testing.assert_frame_equal(_read_csv_cached(filepath, "data", data_home=str(tmp_path)), expected)
+
+
+def test_broken_cache_reads_csv(tmp_path, monkeypatch):
+    filepath = str(tmp_path / "data.csv")
+    pd.DataFrame({"a": [1, 2, 3]}).to_csv(filepath, index=False)
+    _read_csv_cached(filepath, "data", data_home=str(tmp_path))
+    cache_dir, = (tmp_path / "skfair_cache").iterdir()
+    os.remove(cache_dir / "0.npy")
+    pd.testing.assert_frame_equal(_read_csv_cached(filepath, "data", data_home=str(tmp_path)), pd.read_csv(filepath))
+
+    # the broken cache was replaced, so the next load reads the cache instead of the csv
+    assert list((tmp_path / "skfair_cache").iterdir()) == [cache_dir]
+
+    def read_csv(filepath):
+        raise AssertionError("the csv is parsed again")
+
+    monkeypatch.setattr(skfair.datasets.pd, "read_csv", read_csv)
+    assert _read_csv_cached(filepath, "data", data_home=str(tmp_path))["a"].tolist() == [1, 2, 3]
+
+
+def test_unwritable_data_home(monkeypatch):
+    def get_data_home(data_home=None):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(skfair.datasets, "get_data_home", get_data_home)
+    assert load_boston()["data"].shape == (506, 13)
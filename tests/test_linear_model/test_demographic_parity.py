@@ -1,11 +1,19 @@
+import tracemalloc
+
 import pytest
 import numpy as np
+import pandas as pd
+import scipy.sparse as sp
 from cvxpy import SolverError
+from sklearn import config_context
 from sklearn.linear_model import LogisticRegression
+from sklearn.multiclass import OneVsRestClassifier
 from sklearn.utils.estimator_checks import check_estimator
 
 from skfair.common import flatten
 from skfair.linear_model import DemographicParityClassifier
+from skfair.linear_model._solvers import _logistic_cone_structure
+from skfair.linear_model.demographic_parity import _DemographicParityClassifer
 from skfair.metrics import p_percent_score
 from tests.conftest import general_checks, nonmeta_checks, classifier_checks
 
@@ -35,7 +43,7 @@ def test_check_estimator():
     check_estimator(trf)
 
 
-def _test_same(dataset):
+def _test_same(dataset, solver="cvxpy"):
     X, y = dataset
     if X.shape[1] == 1:
         # If we only have one column (which is also the sensitive one) we can't fit
@@ -61,7 +69,7 @@ def _test_same(dataset):
         l1_ratio=None,
     )
     fair = DemographicParityClassifier(
-        covariance_threshold=None, sensitive_cols=sensitive_cols, penalty="none"
+        covariance_threshold=None, sensitive_cols=sensitive_cols, penalty="none", solver=solver
     )
     try:
         fair.fit(X, y)
@@ -93,6 +101,25 @@ def test_same_logistic_multiclass(random_xy_dataset_multiclf):
     _test_same(random_xy_dataset_multiclf)
 
 
+def test_same_logistic_lbfgs(random_xy_dataset_clf):
+    """Tests whether the lbfgs solver performs similar to logistic regression without fairness constraint"""
+    _test_same(random_xy_dataset_clf, solver="lbfgs")
+
+
+@pytest.mark.parametrize("covariance_threshold", [None, 0.5, 0.1, 0.01])
+def test_lbfgs_same_as_cvxpy(sensitive_classification_dataset, covariance_threshold):
+    X, y = sensitive_classification_dataset
+    params = dict(covariance_threshold=covariance_threshold, sensitive_cols=["x1"])
+    cvxpy_fair = DemographicParityClassifier(**params).fit(X, y)
+    lbfgs_fair = DemographicParityClassifier(solver="lbfgs", **params).fit(X, y)
+    np.testing.assert_allclose(
+        lbfgs_fair.estimators_[0].coef_, cvxpy_fair.estimators_[0].coef_, atol=1e-3
+    )
+    np.testing.assert_allclose(
+        lbfgs_fair.estimators_[0].intercept_, cvxpy_fair.estimators_[0].intercept_, atol=1e-3
+    )
+
+
 def test_regularization(sensitive_classification_dataset):
     """Tests whether increasing regularization decreases the norm of the coefficient vector"""
     X, y = sensitive_classification_dataset
@@ -123,3 +150,318 @@ def test_fairness(sensitive_classification_dataset):
         fairness = scorer(fair, X, y)
         assert fairness >= prev_fairness
         prev_fairness = fairness
+
+
+@pytest.mark.parametrize("penalty", ["l1", "none"])
+@pytest.mark.parametrize("covariance_threshold", [None, 0.01])
+def test_cache_problem(penalty, covariance_threshold):
+    X, y = _streaming_dataset(n=500)
+    params = dict(covariance_threshold=covariance_threshold, sensitive_cols=["z"], penalty=penalty)
+    structure = _logistic_cone_structure.cache_info()
+    for start in [0, 500]:
+        X_fit, y_fit = _streaming_dataset(n=1000)
+        X_fit, y_fit = X_fit[start:start + 500], y_fit[start:start + 500]
+        expected = DemographicParityClassifier(**params).fit(X_fit, y_fit).estimators_[0]
+        fair = DemographicParityClassifier(cache_problem=True, **params).fit(X_fit, y_fit).estimators_[0]
+        np.testing.assert_allclose(fair.coef_, expected.coef_, atol=1e-5)
+        np.testing.assert_allclose(fair.intercept_, expected.intercept_, atol=1e-5)
+        np.testing.assert_allclose(fair.fit_stats_["objective"], expected.fit_stats_["objective"], rtol=1e-6)
+        assert fair.fit_stats_["time"]["compilation"] == 0
+
+    # the refit on other data of the same shape reuses the cached structure
+    assert _logistic_cone_structure.cache_info().misses <= structure.misses + 1
+
+
+def test_cache_problem_sparse_same_as_dense():
+    X, y = _streaming_dataset(n=500)
+    X = (X > 0.5).astype(float).values
+    params = dict(covariance_threshold=0.01, sensitive_cols=[3], cache_problem=True)
+    dense = DemographicParityClassifier(**params).fit(X, y).estimators_[0]
+    sparse = DemographicParityClassifier(**params).fit(sp.csc_matrix(X), y).estimators_[0]
+    np.testing.assert_allclose(sparse.coef_, dense.coef_, atol=1e-6)
+
+
+def test_constraint_size_independent_of_n(sensitive_classification_dataset):
+    X, y = sensitive_classification_dataset
+    fair = _DemographicParityClassifer(covariance_threshold=0.1, sensitive_cols=["x1"])
+    sensitive, X_fit, y_fit = fair._prepare_fit_data(X, y)
+    problem, theta, _, _ = fair._build_problem(sensitive, X_fit, y_fit, constrained=True)
+
+    assert sum(constraint.size for constraint in problem.constraints) == sensitive.shape[1]
+    X_design = np.c_[np.ones(len(X_fit)), np.delete(X_fit, fair.sensitive_col_idx_, axis=1)]
+    theta.value = np.random.RandomState(42).normal(size=X_design.shape[1])
+    y_hat = X_design @ theta.value
+    covariance = y_hat @ (sensitive - sensitive.mean(axis=0)) / len(y_hat)
+    np.testing.assert_allclose(problem.constraints[0].args[0].value, np.abs(covariance))
+
+
+def _streaming_dataset(n=4000):
+    rng = np.random.RandomState(0)
+    z = rng.binomial(1, 0.5, n)
+    X = rng.normal(size=(n, 3)) + z[:, np.newaxis] * [1, 0.5, 0]
+    y = (X @ [1, -1, 0.5] + 0.2 + rng.logistic(size=n) > 0).astype(int)
+    return pd.DataFrame(np.c_[X, z], columns=["a", "b", "c", "z"]), y
+
+
+@pytest.mark.parametrize("covariance_threshold", [None, 0.05])
+def test_partial_fit(covariance_threshold):
+    X, y = _streaming_dataset()
+    params = dict(covariance_threshold=covariance_threshold, sensitive_cols=["z"], penalty="none")
+    expected = DemographicParityClassifier(solver="lbfgs", **params).fit(X, y).estimators_[0]
+
+    fair = DemographicParityClassifier(**params)
+    for _ in range(20):
+        for start in range(0, len(X), 200):
+            fair.partial_fit(X[start:start + 200], y[start:start + 200], classes=[0, 1])
+    fair = fair.estimators_[0]
+    assert fair.n_iter_ == 400
+    np.testing.assert_allclose(fair.coef_, expected.coef_, atol=0.05)
+    np.testing.assert_allclose(fair.intercept_, expected.intercept_, atol=0.05)
+
+
+def test_partial_fit_after_fit():
+    X, y = _streaming_dataset()
+    fair = _DemographicParityClassifer(covariance_threshold=0.05, sensitive_cols=["z"], solver="lbfgs").fit(X, y)
+    coef, intercept = fair.coef_.copy(), fair.intercept_.copy()
+
+    fair.partial_fit(X[:200], y[:200])
+    # a single step continues from the fitted coefficients instead of starting over from zeros
+    assert fair.n_iter_ == 1
+    assert fair._n_samples_seen == 200
+    np.testing.assert_allclose(fair.coef_, coef, atol=fair.eta0 + 1e-8)
+    np.testing.assert_allclose(fair.intercept_, intercept, atol=fair.eta0 + 1e-8)
+
+
+@pytest.mark.parametrize("n_features", [3, 5])
+def test_partial_fit_checks_n_features(n_features):
+    X, y = _streaming_dataset(n=400)
+    X = X.values
+    fair = _DemographicParityClassifer(covariance_threshold=0.05, sensitive_cols=[3])
+    fair.partial_fit(X[:200], y[:200], classes=[0, 1])
+
+    chunk = np.c_[X[200:], X[200:, :1]][:, :n_features]
+    with pytest.raises(ValueError, match=f"X has {n_features} features"):
+        fair.partial_fit(chunk, y[200:])
+    assert fair.n_features_in_ == 4
+    fair.partial_fit(X[200:], y[200:])
+    assert fair.n_iter_ == 2
+
+
+def test_partial_fit_running_statistics():
+    X, y = _streaming_dataset()
+    fair = _DemographicParityClassifer(covariance_threshold=0.05, sensitive_cols=["z"])
+    for start in range(0, len(X), 1000):
+        fair.partial_fit(X[start:start + 1000], y[start:start + 1000], classes=[0, 1])
+
+    sensitive, X_fit, y_fit = fair._prepare_fit_data(X, y)
+    np.testing.assert_allclose(
+        fair._running_covariance_statistics(), fair.covariance_statistics(X_fit, y_fit, sensitive), atol=1e-12
+    )
+
+
+def test_partial_fit_needs_classes(sensitive_classification_dataset):
+    X, y = sensitive_classification_dataset
+    with pytest.raises(ValueError):
+        _DemographicParityClassifer(covariance_threshold=0.1, sensitive_cols=["x1"]).partial_fit(X, y)
+
+
+@pytest.mark.parametrize("solver", ["cvxpy", "lbfgs"])
+@pytest.mark.parametrize("sparse_format", ["csr", "csc"])
+def test_sparse_same_as_dense(solver, sparse_format):
+    X, y = _streaming_dataset(n=500)
+    X = (X > 0.5).astype(float).values
+    X_sparse = sp.csr_matrix(X).asformat(sparse_format)
+    params = dict(covariance_threshold=0.01, sensitive_cols=[3], solver=solver)
+    dense = DemographicParityClassifier(**params).fit(X, y).estimators_[0]
+    sparse = DemographicParityClassifier(**params).fit(X_sparse, y).estimators_[0]
+
+    np.testing.assert_allclose(sparse.coef_, dense.coef_, atol=1e-6)
+    np.testing.assert_allclose(sparse.predict_proba(X_sparse), dense.predict_proba(X), atol=1e-6)
+
+
+def test_sparse_trained_columns_keep_stored_elements():
+    X, y = _streaming_dataset(n=500)
+    X_sparse = sp.csr_matrix((X > 0.5).astype(float).values)
+    fair = _DemographicParityClassifer(covariance_threshold=0.01, sensitive_cols=[3]).fit(X_sparse, y)
+
+    trained = fair._trained_columns(X_sparse)
+    # the intercept is not stored as a column of ones, only the sensitive column is dropped
+    assert sp.issparse(trained)
+    assert trained.shape == (500, 3)
+    assert trained.nnz == X_sparse.nnz - X_sparse[:, 3].nnz
+
+
+def test_chunked_prediction():
+    X, y = _streaming_dataset(n=2000)
+    fair = DemographicParityClassifier(covariance_threshold=0.05, sensitive_cols=["z"], solver="lbfgs").fit(X, y)
+    fair = fair.estimators_[0]
+    expected = X.drop(columns="z").values @ fair.coef_[0] + fair.intercept_
+
+    with config_context(working_memory=0.01):
+        np.testing.assert_allclose(fair.decision_function(X), expected)
+        np.testing.assert_allclose(fair.decision_function(X.values), expected)
+        np.testing.assert_allclose(fair.predict_proba(X)[:, 1], 1 / (1 + np.exp(-expected)))
+        np.testing.assert_array_equal(fair.predict(X), expected > 0)
+
+    with pytest.raises(ValueError):
+        fair.decision_function(X.values[:, :3])
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("method", ["fit", "partial_fit"])
+def test_lbfgs_does_not_copy_X(sparse, method):
+    X, y = _streaming_dataset(n=20000)
+    X = np.c_[X.values, np.random.RandomState(0).normal(size=(20000, 46))]
+    n_bytes = X.nbytes
+    if sparse:
+        X = sp.csr_matrix(X)
+        n_bytes = X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    fair = _DemographicParityClassifer(covariance_threshold=0.05, sensitive_cols=[3], solver="lbfgs")
+    kwargs = {"classes": [0, 1]} if method == "partial_fit" else {}
+    tracemalloc.start()
+    try:
+        getattr(fair, method)(X, y, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # only vectors of length n_samples are allocated, never a copy of X without the sensitive column
+    assert peak < 0.5 * n_bytes
+
+
+@pytest.mark.parametrize("with_zeros", [False, True])
+def test_lbfgs_weighted_does_not_copy_X(with_zeros):
+    X, y = _streaming_dataset(n=20000)
+    X = np.c_[X.values, np.random.RandomState(0).normal(size=(20000, 46))]
+    sample_weight = np.ones(len(y))
+    if with_zeros:
+        sample_weight[::2] = 0
+    fair = _DemographicParityClassifer(covariance_threshold=0.05, sensitive_cols=[3], solver="lbfgs")
+    tracemalloc.start()
+    try:
+        fair.fit(X, y, sample_weight=sample_weight)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # rows without weight are kept, they contribute nothing to the products with X
+    assert peak < 0.5 * X.nbytes
+
+
+@pytest.mark.parametrize("solver", ["cvxpy", "lbfgs"])
+def test_float32_same_as_float64(solver):
+    X, y = _streaming_dataset(n=2000)
+    X = X.values
+    fair64 = DemographicParityClassifier(covariance_threshold=0.05, sensitive_cols=[3], solver=solver).fit(X, y)
+    fair32 = DemographicParityClassifier(covariance_threshold=0.05, sensitive_cols=[3], solver=solver).fit(
+        X.astype(np.float32), y
+    )
+    fair64, fair32 = fair64.estimators_[0], fair32.estimators_[0]
+    np.testing.assert_allclose(fair32.coef_, fair64.coef_, atol=1e-4)
+    np.testing.assert_allclose(fair32.decision_function(X.astype(np.float32)), fair64.decision_function(X), atol=1e-4)
+
+
+def _duplicated_dataset(n=2000):
+    rng = np.random.RandomState(0)
+    X = np.c_[rng.binomial(1, 0.4, size=(n, 3)), rng.binomial(1, 0.5, n)].astype(float)
+    y = (X @ [1, -1, 0.5, 1] + rng.logistic(size=n) > 0).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize("solver, cache_problem", [("cvxpy", False), ("cvxpy", True), ("lbfgs", False)])
+def test_sample_weight_same_as_repeated_rows(solver, cache_problem):
+    X, y = _duplicated_dataset()
+    sample_weight = np.random.RandomState(1).randint(0, 3, len(y))
+    params = dict(covariance_threshold=0.01, sensitive_cols=[3], solver=solver, cache_problem=cache_problem)
+    expected = DemographicParityClassifier(**params).fit(np.repeat(X, sample_weight, axis=0), np.repeat(y, sample_weight))
+    fair = DemographicParityClassifier(**params).fit(X, y, sample_weight=sample_weight)
+    np.testing.assert_allclose(fair.estimators_[0].coef_, expected.estimators_[0].coef_, atol=1e-4)
+
+
+@pytest.mark.parametrize("solver", ["cvxpy", "lbfgs"])
+def test_compress_duplicates(solver):
+    X, y = _duplicated_dataset()
+    params = dict(covariance_threshold=0.01, sensitive_cols=[3], solver=solver)
+    expected = DemographicParityClassifier(**params).fit(X, y).estimators_[0]
+    fair = DemographicParityClassifier(compress_duplicates=True, **params).fit(X, y).estimators_[0]
+    np.testing.assert_allclose(fair.coef_, expected.coef_, atol=1e-4)
+    np.testing.assert_allclose(fair.intercept_, expected.intercept_, atol=1e-4)
+
+
+def test_multiclass_preprocesses_once(mocker):
+    X, _ = _streaming_dataset(n=500)
+    y = pd.cut(X["a"] + X["b"], 3).cat.codes
+    params = dict(covariance_threshold=0.05, sensitive_cols=["z"], solver="lbfgs")
+    expected = OneVsRestClassifier(_DemographicParityClassifer(**params)).fit(X, y)
+
+    split = mocker.spy(_DemographicParityClassifer, "_split_data")
+    fair = DemographicParityClassifier(n_jobs=2, **params).fit(X, y)
+    assert split.call_count == 1
+    for estimator, expected_estimator in zip(fair.estimators_, expected.estimators_):
+        np.testing.assert_allclose(estimator.coef_, expected_estimator.coef_, atol=1e-6)
+    np.testing.assert_array_equal(fair.predict(X), expected.predict(X))
+
+
+@pytest.mark.parametrize("solver", ["cvxpy", "lbfgs"])
+def test_fit_stats(sensitive_classification_dataset, solver):
+    X, y = sensitive_classification_dataset
+    fitted = []
+    fair = DemographicParityClassifier(
+        covariance_threshold=0.1, sensitive_cols=["x1"], solver=solver, callback=fitted.append
+    ).fit(X, y)
+
+    stats = fair.estimators_[0].fit_stats_
+    assert fitted == fair.estimators_
+    assert set(stats["time"]) == {"validation", "construction", "compilation", "solve", "verification"}
+    assert all(t >= 0 for t in stats["time"].values())
+    assert stats["n_iter"] == fair.estimators_[0].n_iter_
+    assert stats["slack"].shape == (1,) and stats["slack"][0] >= -1e-6
+    assert stats["objective"] < 0
+    if solver == "lbfgs":
+        assert stats["solver"] == "lbfgs"
+
+
+def test_fit_stats_unconstrained_multiclass():
+    X, _ = _streaming_dataset(n=300)
+    y = pd.cut(X["a"], 3).cat.codes
+    fitted = []
+    fair = DemographicParityClassifier(covariance_threshold=None, sensitive_cols=["z"], callback=fitted.append)
+    fair.fit(X, y)
+    assert len(fitted) == 3
+    assert all(estimator.fit_stats_["slack"] is None for estimator in fitted)
+
+
+@pytest.mark.parametrize("solver", ["cvxpy", "lbfgs"])
+def test_working_set(solver):
+    X, y = _streaming_dataset(n=20000)
+    params = dict(covariance_threshold=0.05, sensitive_cols=["z"], solver=solver)
+    expected = DemographicParityClassifier(**params).fit(X, y).estimators_[0]
+    fair = DemographicParityClassifier(working_set_size=1000, working_set_tol=2e-2, random_state=0, **params)
+    fair = fair.fit(X, y).estimators_[0]
+
+    assert 1000 <= fair.fit_stats_["working_set_size"] < len(y)
+    np.testing.assert_allclose(fair.coef_, expected.coef_, atol=0.15)
+    sensitive, X_fit, y_fit = fair._prepare_fit_data(X, y)
+    theta = np.r_[fair.intercept_, fair.coef_[0]]
+    covariance = theta @ fair.covariance_statistics(X_fit, y_fit, sensitive)
+    assert np.all(np.abs(covariance) <= 0.05 + 1e-6)
+
+
+def test_working_set_grows_to_full_data():
+    X, y = _streaming_dataset(n=1000)
+    params = dict(covariance_threshold=0.05, sensitive_cols=["z"], solver="lbfgs")
+    expected = DemographicParityClassifier(**params).fit(X, y).estimators_[0]
+    fair = DemographicParityClassifier(working_set_size=300, working_set_tol=0, **params).fit(X, y).estimators_[0]
+
+    assert fair.fit_stats_["working_set_size"] == len(y)
+    np.testing.assert_allclose(fair.coef_, expected.coef_, atol=1e-5)
+
+
+def test_working_set_skips_unweighted_rows():
+    X, y = _streaming_dataset(n=1000)
+    sample_weight = np.r_[np.zeros(600), np.ones(400)]
+    params = dict(covariance_threshold=0.05, sensitive_cols=["z"], solver="lbfgs")
+    expected = DemographicParityClassifier(**params).fit(X[600:], y[600:]).estimators_[0]
+    fair = DemographicParityClassifier(working_set_size=300, working_set_tol=0, **params)
+    fair = fair.fit(X, y, sample_weight=sample_weight).estimators_[0]
+
+    assert fair.fit_stats_["working_set_size"] == 400
+    np.testing.assert_allclose(fair.coef_, expected.coef_, atol=1e-5)
@@ -1,5 +1,8 @@
+import tracemalloc
+
 import pytest
 import numpy as np
+import scipy.sparse as sp
 from sklearn.linear_model import LogisticRegression
 from sklearn.utils.estimator_checks import check_estimator
 
@@ -36,7 +39,7 @@ def test_check_estimator():
     check_estimator(trf)
 
 
-def _test_same(dataset):
+def _test_same(dataset, solver="cvxpy"):
     X, y = dataset
     if X.shape[1] == 1:
         # If we only have one column (which is also the sensitive one) we can't fit
@@ -66,6 +69,7 @@ def _test_same(dataset):
         sensitive_cols=sensitive_cols,
         penalty="none",
         positive_target=True,
+        solver=solver,
     )
 
     fair.fit(X, y)
@@ -95,6 +99,25 @@ def test_same_logistic_multiclass(random_xy_dataset_multiclf):
     _test_same(random_xy_dataset_multiclf)
 
 
+def test_same_logistic_lbfgs(random_xy_dataset_clf):
+    """Tests whether the lbfgs solver performs similar to logistic regression without fairness constraint"""
+    _test_same(random_xy_dataset_clf, solver="lbfgs")
+
+
+@pytest.mark.parametrize("covariance_threshold", [None, 0.5, 0.1, 0.01])
+def test_lbfgs_same_as_cvxpy(sensitive_classification_dataset, covariance_threshold):
+    X, y = sensitive_classification_dataset
+    params = dict(covariance_threshold=covariance_threshold, sensitive_cols=["x1"], positive_target=True)
+    cvxpy_fair = EqualOpportunityClassifier(**params).fit(X, y)
+    lbfgs_fair = EqualOpportunityClassifier(solver="lbfgs", **params).fit(X, y)
+    np.testing.assert_allclose(
+        lbfgs_fair.estimators_[0].coef_, cvxpy_fair.estimators_[0].coef_, atol=1e-3
+    )
+    np.testing.assert_allclose(
+        lbfgs_fair.estimators_[0].intercept_, cvxpy_fair.estimators_[0].intercept_, atol=1e-3
+    )
+
+
 def test_regularization(sensitive_classification_dataset):
     """Tests whether increasing regularization decreases the norm of the coefficient vector"""
     X, y = sensitive_classification_dataset
@@ -126,3 +149,69 @@ def test_fairness(sensitive_classification_dataset):
         fairness = scorer(fair, X, y)
         assert fairness >= prev_fairness
         prev_fairness = fairness
+
+
+def test_cache_problem(sensitive_classification_dataset):
+    X, y = sensitive_classification_dataset
+    params = dict(covariance_threshold=0.1, positive_target=True, sensitive_cols=["x1"])
+    expected = EqualOpportunityClassifier(**params).fit(X, y).estimators_[0]
+    for _ in range(2):
+        fair = EqualOpportunityClassifier(cache_problem=True, **params).fit(X, y).estimators_[0]
+        np.testing.assert_allclose(fair.coef_, expected.coef_, atol=1e-5)
+        np.testing.assert_allclose(fair.fit_stats_["slack"], expected.fit_stats_["slack"], atol=1e-5)
+
+
+def test_partial_fit():
+    rng = np.random.RandomState(0)
+    z = rng.binomial(1, 0.5, 4000)
+    X = np.c_[rng.normal(size=(4000, 3)) + z[:, np.newaxis] * [1, 0.5, 0], z]
+    y = (X[:, :3] @ [1, -1, 0.5] + 0.2 + rng.logistic(size=4000) > 0).astype(int)
+    params = dict(covariance_threshold=0.05, positive_target=1, sensitive_cols=[3], penalty="none")
+    expected = EqualOpportunityClassifier(solver="lbfgs", **params).fit(X, y).estimators_[0]
+
+    fair = EqualOpportunityClassifier(**params)
+    for _ in range(20):
+        for start in range(0, len(X), 200):
+            fair.partial_fit(X[start:start + 200], y[start:start + 200], classes=[0, 1])
+    fair = fair.estimators_[0]
+    np.testing.assert_allclose(fair.coef_, expected.coef_, atol=0.05)
+    np.testing.assert_allclose(fair.intercept_, expected.intercept_, atol=0.05)
+
+
+def test_sparse_same_as_dense():
+    rng = np.random.RandomState(0)
+    X = np.c_[rng.binomial(1, 0.3, size=(500, 5)), rng.binomial(1, 0.5, 500)].astype(float)
+    y = (X @ [1, -1, 0.5, 1, -2, 1] + rng.logistic(size=500) > 0).astype(int)
+    params = dict(covariance_threshold=0.01, positive_target=1, sensitive_cols=[5])
+    dense = EqualOpportunityClassifier(**params).fit(X, y).estimators_[0]
+    sparse = EqualOpportunityClassifier(**params).fit(sp.csc_matrix(X), y).estimators_[0]
+
+    np.testing.assert_allclose(sparse.coef_, dense.coef_, atol=1e-6)
+    np.testing.assert_allclose(sparse.decision_function(sp.csr_matrix(X)), dense.decision_function(X), atol=1e-6)
+
+
+def test_compress_duplicates_with_sample_weight():
+    rng = np.random.RandomState(0)
+    X = np.c_[rng.binomial(1, 0.4, size=(2000, 3)), rng.binomial(1, 0.5, 2000)].astype(float)
+    y = (X @ [1, -1, 0.5, 1] + rng.logistic(size=2000) > 0).astype(int)
+    sample_weight = rng.uniform(size=2000)
+    params = dict(covariance_threshold=0.01, positive_target=1, sensitive_cols=[3])
+    expected = EqualOpportunityClassifier(**params).fit(X, y, sample_weight=sample_weight).estimators_[0]
+    fair = EqualOpportunityClassifier(compress_duplicates=True, **params)
+    fair = fair.fit(X, y, sample_weight=sample_weight).estimators_[0]
+    np.testing.assert_allclose(fair.coef_, expected.coef_, atol=1e-4)
+    np.testing.assert_allclose(fair.intercept_, expected.intercept_, atol=1e-4)
+
+
+def test_lbfgs_does_not_copy_constrained_rows():
+    rng = np.random.RandomState(0)
+    X = np.c_[rng.normal(size=(20000, 49)), rng.binomial(1, 0.5, 20000)]
+    y = (X[:, 0] + rng.logistic(size=20000) > 0).astype(int)
+    fair = EqualOpportunityClassifier(covariance_threshold=0.05, positive_target=1, sensitive_cols=[49], solver="lbfgs")
+    tracemalloc.start()
+    try:
+        fair.fit(X, y)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 0.5 * X.nbytes
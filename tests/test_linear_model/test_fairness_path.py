@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from skfair.linear_model import DemographicParityClassifier, EqualOpportunityClassifier, fairness_path
+from skfair.metrics import p_percent_score
+
+
+def test_path_matches_single_fits(sensitive_classification_dataset):
+    X, y = sensitive_classification_dataset
+    thresholds = [10, 0.5, 0.1]
+    clf = DemographicParityClassifier(covariance_threshold=None, sensitive_cols=["x1"], penalty="none")
+    path = fairness_path(clf, X, y, thresholds)
+
+    assert path["coef"].shape == (3, 1)
+    for i, threshold in enumerate(thresholds):
+        fair = DemographicParityClassifier(
+            covariance_threshold=threshold, sensitive_cols=["x1"], penalty="none"
+        ).fit(X, y)
+        np.testing.assert_allclose(path["coef"][i], fair.estimators_[0].coef_[0], atol=1e-3)
+        np.testing.assert_allclose(path["intercept"][i], fair.estimators_[0].intercept_[0], atol=1e-3)
+        assert path["p_percent_score"][i, 0] == pytest.approx(p_percent_score("x1")(fair, X, y))
+
+
+def test_path_objective_decreases_with_threshold(sensitive_classification_dataset):
+    X, y = sensitive_classification_dataset
+    clf = EqualOpportunityClassifier(
+        covariance_threshold=None, positive_target=True, sensitive_cols=["x1"], penalty="none"
+    )
+    path = fairness_path(clf, X, y, [10, 0.5, 0.1, 0.01])
+    assert np.all(np.diff(path["objective"]) <= 1e-6)
+
+
+def test_path_over_C(sensitive_classification_dataset):
+    X, y = sensitive_classification_dataset
+    clf = DemographicParityClassifier(covariance_threshold=None, sensitive_cols=["x1"])
+    path = fairness_path(clf, X, y, [1, 0.5, 0.2, 0.1], param_name="C")
+    assert np.all(np.diff(np.abs(path["coef"].sum(axis=1))) < 0)
+
+
+def test_path_wrong_param(sensitive_classification_dataset):
+    X, y = sensitive_classification_dataset
+    clf = DemographicParityClassifier(covariance_threshold=None, sensitive_cols=["x1"])
+    with pytest.raises(ValueError):
+        fairness_path(clf, X, y, [1, 2], param_name="max_iter")
+
+
+@pytest.mark.parametrize(
+    "params, param_name",
+    [
+        ({"solver": "lbfgs"}, "covariance_threshold"),
+        ({"working_set_size": 10}, "covariance_threshold"),
+        ({"compress_duplicates": True}, "covariance_threshold"),
+        ({"cache_problem": True}, "covariance_threshold"),
+        ({"penalty": "none"}, "C"),
+    ],
+)
+def test_path_unsupported_settings(sensitive_classification_dataset, params, param_name):
+    X, y = sensitive_classification_dataset
+    clf = DemographicParityClassifier(covariance_threshold=None, sensitive_cols=["x1"], **params)
+    with pytest.raises(ValueError):
+        fairness_path(clf, X, y, [1, 0.1], param_name=param_name)
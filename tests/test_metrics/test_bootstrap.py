@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from skfair.metrics import bootstrap_fairness_score, equal_opportunity_score, p_percent_score
+
+
+@pytest.fixture
+def fitted_model():
+    np.random.seed(42)
+    X = np.c_[np.random.randint(0, 2, 500), np.random.normal(0, 1, (500, 2))]
+    y = (X[:, 1] + 0.5 * X[:, 0] + np.random.normal(0, 1, 500) > 0).astype(int)
+    return LogisticRegression().fit(X, y), X, y
+
+
+@pytest.mark.parametrize("metric", [p_percent_score, equal_opportunity_score])
+@pytest.mark.parametrize("method", ["multinomial", "poisson"])
+def test_bootstrap_interval(fitted_model, metric, method):
+    clf, X, y = fitted_model
+    score, lower, upper = bootstrap_fairness_score(metric, 0, clf, X, y, method=method, random_state=42)
+    assert score == pytest.approx(metric(0)(clf, X, y))
+    assert lower <= score <= upper
+    assert 0 <= lower < upper <= 1
+
+
+def test_bootstrap_matches_resampling(fitted_model):
+    """The weighted replicates should behave like re-scoring resampled rows."""
+    clf, X, y = fitted_model
+    rng = np.random.RandomState(0)
+    resampled = [p_percent_score(0)(clf, X[idx]) for idx in rng.randint(0, len(X), (300, len(X)))]
+    _, lower, upper = bootstrap_fairness_score(p_percent_score, 0, clf, X, n_bootstrap=2000, random_state=0)
+    expected_lower, expected_upper = np.quantile(resampled, [0.025, 0.975])
+    assert lower == pytest.approx(expected_lower, abs=0.05)
+    assert upper == pytest.approx(expected_upper, abs=0.05)
+
+
+def test_bootstrap_seed_and_chunking(fitted_model, mocker):
+    clf, X, y = fitted_model
+    predict = mocker.spy(clf, "predict")
+    first = bootstrap_fairness_score(p_percent_score, 0, clf, X, random_state=1, chunk_size=1000)
+    second = bootstrap_fairness_score(p_percent_score, 0, clf, X, random_state=1, chunk_size=300)
+    assert first == second
+    assert predict.call_count == 2
+
+
+def test_bootstrap_wrong_metric(fitted_model):
+    clf, X, y = fitted_model
+    with pytest.raises(ValueError):
+        bootstrap_fairness_score(lambda col: None, 0, clf, X, y)
+    with pytest.raises(ValueError):
+        bootstrap_fairness_score(equal_opportunity_score, 0, clf, X)
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from sklearn.dummy import DummyClassifier
+
+from skfair.metrics import equal_opportunity_score
+
+
+class _FixedPredictions(DummyClassifier):
+    def predict(self, X):
+        return X[:, -1]
+
+
+def test_equal_opportunity_score():
+    X = np.array([[1, 1], [1, 0], [1, 1], [0, 1], [0, 0], [0, 0], [0, 1]])
+    y = np.array([1, 1, 0, 1, 1, 1, 0])
+    # true positive rate is 1/2 for z=1 and 1/3 for z=0
+    assert equal_opportunity_score(0)(_FixedPredictions(), X, y) == pytest.approx((1 / 3) / (1 / 2))
+    assert equal_opportunity_score(0, validate=False)(_FixedPredictions(), X, y) == pytest.approx((1 / 3) / (1 / 2))
+
+
+def test_equal_opportunity_score_not_binary():
+    X = np.array([[0.5, 1], [1, 0], [0, 1]])
+    with pytest.raises(ValueError, match="Found values"):
+        equal_opportunity_score(0)(_FixedPredictions(), X, np.array([1, 1, 1]))
@@ -1,6 +1,11 @@
+from skfair.metrics import false_discovery_score, false_positive_score
 from skfair.metrics.fairness_report import classification_fairness_report
+from skfair.metrics.utils import counts_metric
 
 import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 
 from collections import defaultdict
 
@@ -21,3 +26,85 @@ def test_classification_fairness_report_dict():
 
     report = classification_fairness_report(y, y_pred, groups, output="dict")
     assert type(report) == defaultdict
+
+
+@pytest.mark.parametrize("labels", [None, [0, 1], [0, 1, 2]])
+def test_classification_fairness_report_matches_sklearn(labels):
+    np.random.seed(42)
+    y = np.random.randint(0, 3, 200)
+    y_pred = np.random.randint(0, 3, 200)
+    groups = np.random.choice(["a", "b", "c"], 200)
+    # group "c" only has binary labels to exercise the per-group label set
+    y[groups == "c"] = y[groups == "c"] % 2
+    y_pred[groups == "c"] = y_pred[groups == "c"] % 2
+
+    report = classification_fairness_report(y, y_pred, groups, labels=labels, output="dict")
+    assert list(report.keys()) == list(pd.unique(groups))
+    for group_name, scores in report.items():
+        y_g, y_pred_g = y[groups == group_name], y_pred[groups == group_name]
+        expected = {
+            "TPR": recall_score(y_g, y_pred_g, labels=labels, average="micro"),
+            "FPR": false_positive_score(y_g, y_pred_g, labels=labels),
+            "PPVR": precision_score(y_g, y_pred_g, labels=labels, average="micro"),
+            "FDR": false_discovery_score(y_g, y_pred_g, labels=labels),
+            "ACC": accuracy_score(y_g, y_pred_g),
+            "F1": f1_score(y_g, y_pred_g, labels=labels, average="micro"),
+            "Support": len(y_g),
+        }
+        assert scores == pytest.approx(expected)
+
+
+def test_classification_fairness_report_custom_metric():
+    y = np.array([0, 0, 1, 1, 1])
+    y_pred = np.array([0, 0, 0, 1, 1])
+    groups = [0, 1, 0, 1, 0]
+
+    def n_positive(y_true, y_pred, labels=None):
+        return np.sum(y_pred)
+
+    report = classification_fairness_report(y, y_pred, groups, output="pandas", metrics=[n_positive])
+    assert report.loc["n_positive"].tolist() == [1, 1]
+    assert report.loc["Support"].tolist() == [3, 2]
+
+
+def test_classification_fairness_report_counts_metric(mocker):
+    y = np.array([0, 0, 1, 1, 1])
+    y_pred = np.array([0, 0, 0, 1, 1])
+    groups = [0, 1, 0, 1, 0]
+
+    def n_errors(y_true, y_pred, labels=None):
+        raise AssertionError("should be computed from the confusion matrix")
+
+    n_errors = counts_metric(lambda cm, labels=None: cm.sum() - cm.trace())(n_errors)
+    confusion_matrix = mocker.patch("skfair.metrics.false_positive_score.confusion_matrix")
+    report = classification_fairness_report(
+        y, y_pred, groups, output="pandas", metrics={"errors": n_errors, "FPR": false_positive_score}
+    )
+    assert report.loc["errors"].tolist() == [1, 0]
+    confusion_matrix.assert_not_called()
+
+
+@pytest.mark.parametrize("missing", [None, np.nan])
+def test_classification_fairness_report_missing_groups(missing):
+    y = np.array([0, 0, 1, 1, 1])
+    y_pred = np.array([0, 0, 0, 1, 1])
+    groups = ["a", missing, "a", missing, "a"]
+
+    def n_positive(y_true, y_pred, labels=None):
+        return np.sum(y_pred)
+
+    report = classification_fairness_report(y, y_pred, groups, output="pandas", metrics=[n_positive])
+    assert report.loc["n_positive"].tolist() == [1, 1]
+    assert report.loc["Support"].tolist() == [3, 2]
+    report = classification_fairness_report(y, y_pred, groups, output="pandas")
+    assert report.loc["ACC"].tolist() == [2 / 3, 1.0]
+
+
+def test_classification_fairness_report_mixed_type_groups():
+    y = np.array([0, 1, 1, 0])
+    y_pred = np.array([0, 1, 0, 0])
+
+    report = classification_fairness_report(y, y_pred, [1, "a", 1, "a"], output="dict")
+    assert list(report) == [1, "a"]
+    report = classification_fairness_report(y, y_pred, ["x", "y", "x", "y"], group_names=[1, "a", 1, "a"], output="dict")
+    assert list(report) == [1, "a"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV
+
+from skfair.metrics import equal_opportunity_score, make_fairness_scorer, p_percent_score
+
+
+@pytest.fixture
+def fitted_model():
+    np.random.seed(42)
+    X = pd.DataFrame({
+        "x1": np.random.randint(0, 2, 100),
+        "x2": np.random.randint(0, 2, 100),
+        "x3": np.random.normal(0, 1, 100),
+    })
+    y = (X["x3"] + X["x1"] > 0.5).astype(int)
+    return LogisticRegression().fit(X, y), X, y
+
+
+def test_scores_match_single_metrics(fitted_model):
+    clf, X, y = fitted_model
+    scorer = make_fairness_scorer(["x1", "x2"], scoring={"accuracy": "accuracy"})
+    scores = scorer(clf, X, y)
+    assert scores == {
+        "p_percent_score_x1": p_percent_score("x1")(clf, X, y),
+        "p_percent_score_x2": p_percent_score("x2")(clf, X, y),
+        "equal_opportunity_score_x1": equal_opportunity_score("x1")(clf, X, y),
+        "equal_opportunity_score_x2": equal_opportunity_score("x2")(clf, X, y),
+        "accuracy": clf.score(X, y),
+    }
+
+
+def test_predict_called_once(fitted_model, mocker):
+    clf, X, y = fitted_model
+    predict = mocker.spy(clf, "predict")
+    make_fairness_scorer(["x1", "x2"], scoring={"accuracy": "accuracy"})(clf, X, y)
+    assert predict.call_count == 1
+
+
+def test_gridsearch(fitted_model):
+    _, X, y = fitted_model
+    scorer = make_fairness_scorer(["x1"], metrics=[p_percent_score], scoring={"accuracy": "accuracy"})
+    grid = GridSearchCV(LogisticRegression(), param_grid={"C": [0.1, 1.0]}, scoring=scorer, refit="accuracy", cv=2)
+    results = pd.DataFrame(grid.fit(X, y).cv_results_)
+    assert {"mean_test_p_percent_score_x1", "mean_test_accuracy"} <= set(results.columns)
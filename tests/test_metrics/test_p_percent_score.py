@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from sklearn.dummy import DummyClassifier
+
+from skfair.metrics import p_percent_score
+
+
+class _FixedPredictions(DummyClassifier):
+    def predict(self, X):
+        return X[:, -1]
+
+
+def test_p_percent_score():
+    # z=1 gets a positive prediction half the time, z=0 a quarter of the time
+    X = np.array([[1, 1], [1, 0], [0, 1], [0, 0], [0, 0], [0, 0]])
+    assert p_percent_score(0)(_FixedPredictions(), X) == pytest.approx(0.25 / 0.5)
+    assert p_percent_score(0, validate=False)(_FixedPredictions(), X) == pytest.approx(0.25 / 0.5)
+
+
+def test_p_percent_score_not_binary():
+    X = np.array([[2, 1], [1, 0], [0, 1]])
+    with pytest.raises(ValueError, match="Found values"):
+        p_percent_score(0)(_FixedPredictions(), X)
+
+
+def test_p_percent_score_no_positives():
+    X = np.array([[1, 0], [1, 0], [0, 1], [0, 0]])
+    with pytest.warns(RuntimeWarning):
+        assert p_percent_score(0)(_FixedPredictions(), X) == 0
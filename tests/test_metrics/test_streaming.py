@@ -0,0 +1,143 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+import pytest
+
+from skfair.metrics import (
+    equal_opportunity_score,
+    false_discovery_score,
+    false_positive_score,
+    p_percent_score,
+    EqualOpportunityAccumulator,
+    FairnessReportAccumulator,
+    FalseDiscoveryAccumulator,
+    FalsePositiveAccumulator,
+    GroupConfusionCounts,
+    PPercentAccumulator,
+    evaluate_sharded,
+)
+from skfair.metrics.fairness_report import classification_fairness_report
+
+
+class _FixedPredictions:
+    def __init__(self, y_pred):
+        self.y_pred = y_pred
+
+    def predict(self, X):
+        return self.y_pred
+
+
+@pytest.fixture
+def predictions():
+    np.random.seed(42)
+    y_true = np.random.randint(0, 3, 1000)
+    y_pred = np.where(np.random.rand(1000) < 0.7, y_true, np.random.randint(0, 3, 1000))
+    sensitive = np.random.randint(0, 2, 1000)
+    return y_true, y_pred, sensitive
+
+
+def _chunks(*arrays, size=128):
+    for start in range(0, len(arrays[0]), size):
+        yield tuple(a[start:start + size] for a in arrays)
+
+
+def test_group_confusion_counts_merge(predictions):
+    y_true, y_pred, sensitive = predictions
+    full = GroupConfusionCounts().update(y_true, y_pred, sensitive)
+    merged = GroupConfusionCounts()
+    for chunk in _chunks(y_true, y_pred, sensitive):
+        merged.merge(GroupConfusionCounts().update(*chunk))
+    assert merged.groups_ == full.groups_
+    np.testing.assert_array_equal(merged.classes_, full.classes_)
+    np.testing.assert_array_equal(merged.counts_, full.counts_)
+
+
+def test_group_confusion_counts_new_classes():
+    counts = GroupConfusionCounts().update([1, 1], [1, 1], ["a", "a"]).update([0, 2], [2, 0], ["b", "a"])
+    np.testing.assert_array_equal(counts.classes_, [0, 1, 2])
+    np.testing.assert_array_equal(counts.counts_[0], [[0, 0, 0], [0, 2, 0], [1, 0, 0]])
+    np.testing.assert_array_equal(counts.counts_[1], [[0, 0, 1], [0, 0, 0], [0, 0, 0]])
+
+
+def test_binary_accumulators(predictions):
+    y_true, y_pred, sensitive = predictions
+    X = sensitive[:, np.newaxis]
+    p_percent, equal_opportunity = PPercentAccumulator(), EqualOpportunityAccumulator()
+    for chunk in _chunks(y_true, y_pred, sensitive):
+        p_percent.update(*chunk)
+        equal_opportunity.update(*chunk)
+    assert p_percent.result() == p_percent_score(0)(_FixedPredictions(y_pred), X)
+    assert equal_opportunity.result() == equal_opportunity_score(0)(_FixedPredictions(y_pred), X, y_true)
+
+
+def test_binary_accumulators_not_binary():
+    with pytest.raises(ValueError, match="Found values"):
+        PPercentAccumulator().update([1, 0], [1, 0], [0, 2]).result()
+
+
+@pytest.mark.parametrize("labels", [None, [0, 1]])
+def test_confusion_matrix_accumulators(predictions, labels):
+    y_true, y_pred, _ = predictions
+    false_positive, false_discovery = FalsePositiveAccumulator(labels), FalseDiscoveryAccumulator(labels)
+    for y_true_chunk, y_pred_chunk in _chunks(y_true, y_pred):
+        false_positive.update(y_true_chunk, y_pred_chunk)
+        false_discovery.update(y_true_chunk, y_pred_chunk)
+    assert false_positive.result() == false_positive_score(y_true, y_pred, labels)
+    assert false_discovery.result() == false_discovery_score(y_true, y_pred, labels)
+
+
+def test_report_accumulator(predictions):
+    y_true, y_pred, sensitive = predictions
+    report = FairnessReportAccumulator()
+    for chunk in _chunks(y_true, y_pred, sensitive):
+        report.update(*chunk)
+    assert report.result(output="dict") == classification_fairness_report(y_true, y_pred, sensitive, output="dict")
+
+
+def test_report_accumulator_needs_count_metrics():
+    with pytest.raises(ValueError):
+        FairnessReportAccumulator(metrics={"custom": lambda y_true, y_pred, labels: 0})
+
+
+def test_unfitted_accumulator():
+    with pytest.raises(ValueError, match="update"):
+        PPercentAccumulator().result()
+
+
+@pytest.mark.parametrize("executor_cls", [None, ThreadPoolExecutor, ProcessPoolExecutor])
+def test_evaluate_sharded(predictions, executor_cls):
+    y_true, y_pred, sensitive = predictions
+    shards = list(_chunks(y_true, y_pred, sensitive, size=300))
+    expected = classification_fairness_report(y_true, y_pred, sensitive, output="dict")
+    if executor_cls is None:
+        report = evaluate_sharded(FairnessReportAccumulator(), shards, output="dict")
+    else:
+        with executor_cls(2) as executor:
+            report = evaluate_sharded(FairnessReportAccumulator(), shards, executor=executor, output="dict")
+    assert report == expected
+
+
+def test_evaluate_sharded_lazy_shards(predictions):
+    y_true, y_pred, sensitive = predictions
+    shards = [partial(tuple, chunk) for chunk in _chunks(y_true, y_pred, sensitive)]
+    expected = PPercentAccumulator().update(y_true, y_pred, sensitive).result()
+    assert evaluate_sharded(PPercentAccumulator(), shards) == expected
+
+
+def test_merge_different_accumulators():
+    with pytest.raises(TypeError):
+        PPercentAccumulator().merge(EqualOpportunityAccumulator())
+
+
+@pytest.mark.parametrize("missing", [None, np.nan])
+def test_group_confusion_counts_missing_groups(missing):
+    groups = np.array(["a", missing, "a", missing, "b", missing], dtype=object)
+    y_true, y_pred = np.array([0, 1, 1, 0, 1, 1]), np.array([0, 1, 0, 0, 1, 0])
+    full = GroupConfusionCounts().update(y_true, y_pred, groups)
+    chunked = GroupConfusionCounts()
+    for chunk in _chunks(y_true, y_pred, groups, size=2):
+        chunked.merge(GroupConfusionCounts().update(*chunk))
+    assert len(full.groups_) == len(chunked.groups_) == 3
+    np.testing.assert_array_equal(chunked.counts_, full.counts_)
+    np.testing.assert_array_equal(full.counts_[1], [[1, 0], [1, 1]])
@@ -1,6 +1,7 @@
-from skfair.metrics.utils import true_false_positive_negative
+from skfair.metrics.utils import batch_true_false_positive_negative, select_labels, true_false_positive_negative
 
 import numpy as np
+import pytest
 
 
 def test_binary_conf_matrix():
@@ -26,3 +27,33 @@ def test_multiclass_conf_matrix():
     assert fp == 4
     assert fn == 4
     assert tn == 10
+
+
+def test_select_labels():
+    conf_matrix = np.array([
+        [1, 0, 1],
+        [0, 1, 1],
+        [1, 1, 1]
+    ])
+    np.testing.assert_array_equal(select_labels(conf_matrix, [0, 2]), [[1, 1], [1, 1]])
+    assert select_labels(conf_matrix) is conf_matrix
+
+
+@pytest.mark.parametrize("n_classes", [1, 2, 3, 10])
+def test_batch_conf_matrix(n_classes):
+    np.random.seed(42)
+    conf_matrices = np.random.randint(0, 10, (4, n_classes, n_classes))
+    tn, fp, fn, tp = batch_true_false_positive_negative(conf_matrices)
+    for i, conf_matrix in enumerate(conf_matrices):
+        assert (tn[i], fp[i], fn[i], tp[i]) == true_false_positive_negative(conf_matrix)
+        if n_classes == 2:
+            assert (tn[i], fp[i], fn[i], tp[i]) == tuple(conf_matrix.ravel())
+            continue
+        for c in range(n_classes):
+            others = np.arange(n_classes) != c
+            tp[i] -= conf_matrix[c, c]
+            fp[i] -= conf_matrix[others, c].sum()
+            fn[i] -= conf_matrix[c, others].sum()
+            tn[i] -= conf_matrix[np.ix_(others, others)].sum()
+    if n_classes != 2:
+        assert not np.any([tn, fp, fn, tp])
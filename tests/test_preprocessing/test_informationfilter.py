@@ -1,7 +1,11 @@
+import tracemalloc
+
 import pytest
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 
+from sklearn import config_context
 from sklearn.pipeline import Pipeline
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import GridSearchCV
@@ -34,6 +38,66 @@ def test_v_columns_orthogonal():
     assert v_values.prod(axis=1).sum() == pytest.approx(0, abs=1e-5)
 
 
+@pytest.mark.parametrize("columns", [[11, 12], [0], [3, 5, 11]])
+def test_projection_same_as_lstsq(columns):
+    X, y = load_boston(return_X_y=True)
+    sensitive = X[:, columns]
+    X_fair = X - sensitive @ np.linalg.lstsq(sensitive, X, rcond=None)[0]
+    expected, resid, rank, s = np.linalg.lstsq(X, X_fair, rcond=None)
+    ifilter = InformationFilter(columns=columns).fit(X)
+    np.testing.assert_allclose(ifilter.projection_, expected, atol=1e-8)
+
+
+def test_no_columns_is_identity():
+    X, y = load_boston(return_X_y=True)
+    np.testing.assert_allclose(InformationFilter(columns=[]).fit_transform(X), X)
+
+
+@pytest.mark.parametrize("columns", [[11, 12], [0], []])
+def test_partial_fit_same_as_fit(columns):
+    X, y = load_boston(return_X_y=True)
+    expected = InformationFilter(columns=columns).fit(X)
+    ifilter = InformationFilter(columns=columns)
+    for chunk in np.array_split(X, 7):
+        ifilter.partial_fit(chunk)
+    np.testing.assert_allclose(ifilter.projection_, expected.projection_, atol=1e-8)
+    np.testing.assert_allclose(ifilter.transform(X), expected.transform(X), atol=1e-6)
+
+
+def test_merge_same_as_fit():
+    X, y = load_boston(return_X_y=True)
+    expected = InformationFilter(columns=[11, 12]).fit(X)
+    first, second = np.array_split(X, 2)
+    ifilter = InformationFilter(columns=[11, 12]).fit(first)
+    ifilter.merge(InformationFilter(columns=[11, 12]).partial_fit(second))
+    np.testing.assert_allclose(ifilter.projection_, expected.projection_, atol=1e-8)
+
+
+def test_partial_fit_wide_chunks():
+    n_features = 3000
+    X = np.random.RandomState(0).normal(size=(500, n_features))
+    ifilter = InformationFilter(columns=[0, 1])
+    tracemalloc.start()
+    try:
+        for chunk in np.array_split(X, 20):
+            ifilter.partial_fit(chunk)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # a dense (n_features, n_features) matrix per chunk would take 72 MB
+    assert peak < 8 * 2 ** 20
+    np.testing.assert_allclose(ifilter.coef_, InformationFilter(columns=[0, 1]).fit(X).coef_, atol=1e-8)
+
+
+def test_partial_fit_different_columns():
+    X, y = load_boston(return_X_y=True)
+    ifilter = InformationFilter(columns=[11, 12]).partial_fit(X)
+    with pytest.raises(ValueError):
+        ifilter.partial_fit(X[:, :12])
+    with pytest.raises(ValueError):
+        ifilter.merge(InformationFilter(columns=[11]).fit(X))
+
+
 def test_output_orthogonal():
     X, y = load_boston(return_X_y=True)
     X_fair = InformationFilter(columns=[11, 12]).fit_transform(X)
@@ -121,6 +185,84 @@ def test_output_orthogonal_general_cols():
         assert all([(c * df[col]).sum() < 1e-5 for c in X_fair.T])
 
 
+@pytest.mark.parametrize("alpha", [0.0, 0.5, 1.0])
+def test_float32_preserved(alpha):
+    X, y = load_boston(return_X_y=True)
+    ifilter = InformationFilter(columns=[11, 12], alpha=alpha).fit(X)
+    X_fair = ifilter.transform(X.astype(np.float32))
+    assert X_fair.dtype == np.float32
+    np.testing.assert_allclose(X_fair, ifilter.transform(X), rtol=1e-4, atol=1e-3)
+
+
+@pytest.mark.parametrize("alpha", [0.0, 0.5, 1.0])
+def test_transform_same_as_projection(alpha):
+    X, y = load_boston(return_X_y=True)
+    ifilter = InformationFilter(columns=[11, 12], alpha=alpha).fit(X)
+    expected = alpha * np.delete(X @ ifilter.projection_, [11, 12], axis=1) + (1 - alpha) * np.delete(
+        X, [11, 12], axis=1
+    )
+    with config_context(working_memory=0.01):
+        np.testing.assert_allclose(ifilter.transform(X), expected, atol=1e-8)
+
+
+def test_projection_not_stored():
+    X, y = load_boston(return_X_y=True)
+    ifilter = InformationFilter(columns=[11, 12]).fit(X)
+    assert ifilter.coef_.shape == (2, 13)
+    assert ifilter.n_features_in_ == 13
+    assert not any(np.shape(value) == (13, 13) for value in vars(ifilter).values())
+
+
+def test_transform_out():
+    X, y = load_boston(return_X_y=True)
+    ifilter = InformationFilter(columns=[11, 12]).fit(X)
+    out = np.empty((X.shape[0], X.shape[1] - 2))
+    assert ifilter.transform(X, out=out) is out
+    np.testing.assert_allclose(out, ifilter.transform(X))
+    with pytest.raises(ValueError):
+        ifilter.transform(X, out=np.empty((X.shape[0], X.shape[1])))
+
+
+@pytest.mark.parametrize("sparse_format", ["csr", "csc"])
+@pytest.mark.parametrize("alpha", [0.0, 0.5, 1.0])
+def test_sparse_same_as_dense(sparse_format, alpha):
+    X, y = load_boston(return_X_y=True)
+    X_sparse = sp.csr_matrix(X).asformat(sparse_format)
+    expected = InformationFilter(columns=[11, 12], alpha=alpha).fit(X)
+    ifilter = InformationFilter(columns=[11, 12], alpha=alpha).fit(X_sparse)
+    np.testing.assert_allclose(ifilter.projection_, expected.projection_, atol=1e-8)
+    partial = InformationFilter(columns=[11, 12], alpha=alpha).partial_fit(X_sparse[:200]).partial_fit(X_sparse[200:])
+    np.testing.assert_allclose(partial.projection_, expected.projection_, atol=1e-8)
+
+    X_fair = ifilter.transform(X_sparse)
+    assert sp.issparse(X_fair) == (alpha == 0)
+    np.testing.assert_allclose(X_fair.toarray() if alpha == 0 else X_fair, expected.transform(X), atol=1e-8)
+
+
+def test_wide_sparse_no_dense_projection():
+    n_features = 5001
+    X = sp.random(2000, n_features, density=0.001, format="csr", random_state=0)
+    X[:, :2] = np.random.RandomState(0).binomial(1, 0.5, size=(2000, 2))
+    tracemalloc.start()
+    try:
+        ifilter = InformationFilter(columns=[0, 1]).fit(X)
+        ifilter.partial_fit(X)
+        X_fair = InformationFilter(columns=[0, 1], alpha=0).fit(X).transform(X)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # a dense (n_features, n_features) matrix would take 200 MB
+    assert peak < 10 * 2 ** 20
+    assert ifilter.coef_.shape == (2, n_features)
+    assert sp.issparse(X_fair) and X_fair.shape == (2000, n_features - 2)
+
+
+def test_sparse_string_columns():
+    X, y = load_boston(return_X_y=True)
+    with pytest.raises(ValueError):
+        InformationFilter(columns=["b"]).fit(sp.csr_matrix(X))
+
+
 def test_pipeline_gridsearch():
     X, y = load_boston(return_X_y=True)
     pipe = Pipeline(